@@ -0,0 +1,83 @@
+'''
+benchmarks ReadData.read_all_csv and read_all_json with the default pandas 
+parsers against the multithreaded pyarrow engine
+
+usage: python benchmarks/benchmark_read.py [size_mb] [directory]
+'''
+
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import dpyp as dp
+
+
+def write_sample_files(path: str, size_mb: int) -> None:
+    '''writes a csv and a line-delimited json file of roughly size_mb each'''
+    
+    # roughly 60 bytes per csv row
+    rows = size_mb * 1_000_000 // 60
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.normal(size = rows),
+        'amount': rng.integers(0, 1_000_000, size = rows),
+        'region': rng.choice(['scot', 'rUK', 'international'], size = rows),
+        'date': pd.Timestamp('2024-01-01') 
+            + pd.to_timedelta(rng.integers(0, 365, size = rows), unit = 'D')
+    })
+    os.makedirs(os.path.join(path, 'csv'), exist_ok = True)
+    os.makedirs(os.path.join(path, 'json'), exist_ok = True)
+    df.to_csv(os.path.join(path, 'csv', 'sample.csv'), index = False)
+    df.to_json(
+        os.path.join(path, 'json', 'sample.json'), 
+        orient = 'records', 
+        lines = True,
+        date_format = 'iso'
+    )
+
+
+def time_read(read, *args, **kwargs) -> float:
+    '''returns best wall time of three reads in seconds'''
+    
+    timings = list()
+    for _ in range(3):
+        start = time.perf_counter()
+        read(*args, messaging = False, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(size_mb: int = 200, path: str = None) -> None:
+    '''prints read times for each engine'''
+    
+    with tempfile.TemporaryDirectory(dir = path) as temp_path:
+        write_sample_files(temp_path, size_mb)
+        csv_path = os.path.join(temp_path, 'csv')
+        json_path = os.path.join(temp_path, 'json')
+        results = {
+            'csv (c)': time_read(dp.ReadData.read_all_csv, csv_path),
+            'csv (pyarrow)': time_read(
+                dp.ReadData.read_all_csv, csv_path, engine = 'pyarrow'
+            ),
+            'json (ujson, lines)': time_read(
+                dp.ReadData.read_all_json, 
+                json_path, 
+                engine = 'ujson', 
+                lines = True
+            ),
+            'json (pyarrow)': time_read(
+                dp.ReadData.read_all_json, json_path, engine = 'pyarrow'
+            )
+        }
+    for name, seconds in results.items():
+        print(f'{name:<22}{seconds:>8.2f}s{size_mb / seconds:>10.1f} MB/s')
+
+
+if __name__ == '__main__':
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    path = sys.argv[2] if len(sys.argv) > 2 else None
+    main(size_mb, path)
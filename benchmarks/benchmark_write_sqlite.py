@@ -0,0 +1,73 @@
+'''
+benchmarks WriteData.write_dict_to_sqlite using to_sql against the bulk 
+transactional path, with and without the WAL / synchronous = OFF pragmas
+
+usage: python benchmarks/benchmark_write_sqlite.py [rows] [directory]
+'''
+
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import dpyp as dp
+
+
+def sample_dict(rows: int) -> dict:
+    '''returns four frames of rows rows each'''
+    
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.normal(size = rows),
+        'amount': rng.integers(0, 1_000_000, size = rows),
+        'region': rng.choice(['scot', 'rUK', 'international'], size = rows),
+        'date': pd.Timestamp('2024-01-01') 
+            + pd.to_timedelta(rng.integers(0, 365, size = rows), unit = 'D')
+    })
+    return {f'table_{i}': df for i in range(4)}
+
+
+def time_write(input_dict: dict, path: str, **kwargs) -> float:
+    '''returns best wall time of three writes to a new database in seconds'''
+    
+    timings = list()
+    for _ in range(3):
+        start = time.perf_counter()
+        dp.WriteData.write_dict_to_sqlite(
+            input_dict, path, overwrite = True, messaging = False, **kwargs
+        )
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows: int = 1_000_000, path: str = None) -> None:
+    '''prints write times for each method'''
+    
+    input_dict = sample_dict(rows)
+    total_rows = rows * len(input_dict)
+    with tempfile.TemporaryDirectory(dir = path) as temp_path:
+        db_path = os.path.join(temp_path, 'benchmark.db')
+        results = {
+            'to_sql': time_write(input_dict, db_path),
+            'bulk': time_write(input_dict, db_path, bulk = True),
+            'bulk (wal, sync off)': time_write(
+                input_dict, 
+                db_path, 
+                bulk = True, 
+                journal_mode = 'WAL', 
+                synchronous = 'OFF'
+            )
+        }
+    for name, seconds in results.items():
+        print(
+            f'{name:<22}{seconds:>8.2f}s{total_rows / seconds:>12,.0f} rows/s'
+        )
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else None
+    main(rows, path)
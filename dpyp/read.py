@@ -7,205 +7,2207 @@ into data pipelines
 import pandas as pd
 import dpyp as dp
 import os
+import io
+import csv
+import bz2
+import gzip
+import lzma
+import json
+import math
+import random
+import hashlib
 import sqlite3
 from sqlite3 import OperationalError
+import time
 import logging
+import asyncio
+import fnmatch
+import operator
+import importlib.util
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pandas.tseries.api import guess_datetime_format
+from collections.abc import Mapping
+from contextlib import closing, ExitStack
+from urllib.parse import quote
+from typing import Union
+from concurrent.futures import (
+    Executor, ThreadPoolExecutor, ProcessPoolExecutor
+)
 
 
 logger = logging.getLogger(__name__)
 
 
-class ReadData:
-    '''contains functionality for reading data from various file formats'''
+def _read_xlsx(
+    file_path: str, 
+    sheets: Union[str, list] = None, 
+    **kwargs
+):
+    '''
+    reads the first sheet of a workbook as a dataframe, or all sheets 
+    (sheets = 'all') or the named sheets as a dict of {sheet: dataframe} in 
+    a single pass over the workbook
+    '''
     
-    @staticmethod     
-    def read_all_json(path: str, messaging: bool = True) -> dict:
-        '''loads all json files from directory and assigns to dataframes'''
+    if sheets is None:
+        return pd.read_excel(file_path, **kwargs)
+    if sheets == 'all':
+        sheet_name = None
+    else:
+        sheet_name = [sheets] if isinstance(sheets, str) else list(sheets)
+    return pd.read_excel(file_path, sheet_name = sheet_name, **kwargs)
+
+
+def _read_parquet(
+    file_path: str, 
+    as_arrow: bool = False, 
+    **kwargs
+) -> pd.DataFrame:
+    '''reads a parquet file as a dataframe, or a pyarrow table if as_arrow'''
+    
+    if as_arrow:
+        return pq.read_table(file_path, **kwargs)
+    return pd.read_parquet(file_path, **kwargs)
+
+
+def _read_feather(
+    file_path: str, 
+    columns: list = None, 
+    filters: list = None, 
+    memory_map: bool = False,
+    as_arrow: bool = False,
+    **kwargs
+) -> pd.DataFrame:
+    '''
+    - reads a feather file, pushing column selection and row filters down to 
+    pyarrow
+    - memory_map maps the file rather than reading it, uncompressed files are
+    then read without copying and share the page cache between processes
+    - as_arrow returns the pyarrow table rather than a dataframe
+    '''
+    
+    if not (filters is not None or memory_map or as_arrow):
+        return pd.read_feather(file_path, columns = columns, **kwargs)
+    if filters is None:
+        table = feather.read_table(
+            file_path, columns = columns, memory_map = memory_map
+        )
+    else:
+        table = ds.dataset(file_path, format = 'feather').to_table(
+            columns = columns, filter = pq.filters_to_expression(filters)
+        )
+    if as_arrow:
+        return table
+    # split blocks lets pandas wrap arrow buffers instead of consolidating
+    return table.to_pandas(split_blocks = True)
+
+
+def _connect_read_only(
+    path: str, 
+    mmap_size: int = 2 ** 28
+) -> sqlite3.Connection:
+    '''
+    opens a read-only sqlite connection tuned for bulk reads, pages are 
+    memory-mapped up to mmap_size bytes
+    '''
+    
+    conn = sqlite3.connect(
+        f'file:{quote(os.path.abspath(path))}?mode=ro', uri = True
+    )
+    conn.execute(f'PRAGMA mmap_size = {int(mmap_size)}')
+    conn.execute('PRAGMA query_only = ON')
+    return conn
+
+
+def _quote_identifier(name: str) -> str:
+    '''returns name quoted for use as a sqlite identifier'''
+    
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _fetch_table_names(conn: sqlite3.Connection) -> list:
+    '''returns names of all tables in a sqlite database'''
+    
+    table_names = conn.execute('''
+        SELECT name 
+        FROM sqlite_master 
+        WHERE type = 'table';
+    ''').fetchall()
+    return [table_name[0] for table_name in table_names]
+
+
+def _check_sqlite_columns(
+    conn: sqlite3.Connection, 
+    table: str, 
+    read_options: dict
+) -> None:
+    '''
+    raises ValueError if the columns or watermark of a table read are not 
+    columns of the table (or rowid), as sqlite would read unknown quoted 
+    identifiers as string literals
+    '''
+    
+    table_columns = {
+        row[1] for row in conn.execute(
+            f'PRAGMA table_info({_quote_identifier(table)})'
+        ).fetchall()
+    }
+    requested = list(read_options.get('columns') or list())
+    if read_options.get('watermark') is not None:
+        requested.append(read_options['watermark'])
+    missing = [
+        col for col in requested 
+        if col not in table_columns 
+        and col.lower() not in ('rowid', '_rowid_', 'oid')
+    ]
+    if missing:
+        raise ValueError(f'Columns {missing} not found in table {table}.')
+
+
+def _read_sqlite_table(
+    path: str, 
+    table: str, 
+    columns: list = None,
+    where: str = None,
+    watermark: str = None,
+    since = None,
+    nrows: int = None,
+    chunksize: int = None,
+    mmap_size: int = 2 ** 28
+):
+    '''
+    - reads a sqlite table on its own connection, returning a dataframe or a 
+    generator of chunks if chunksize is set
+    - columns, where (an sql condition) and nrows are applied in the query
+    - if watermark (a column or 'rowid') is set, only rows above since are 
+    read and the watermark values are returned in WATERMARK_COLUMN
+    '''
+    
+    selected = '*' if columns is None \
+        else ', '.join(_quote_identifier(col) for col in columns)
+    conditions = list()
+    params = list()
+    if where is not None:
+        conditions.append(f'({where})')
+    if watermark is not None:
+        watermark = _quote_identifier(watermark)
+        selected = f'{selected}, {watermark} AS {WATERMARK_COLUMN}'
+        if since is not None:
+            conditions.append(f'{watermark} > ?')
+            params.append(since)
+            
+    query = f'SELECT {selected} FROM {_quote_identifier(table)}'
+    if conditions:
+        query = f'{query} WHERE {" AND ".join(conditions)}'
+    if watermark is not None:
+        query = f'{query} ORDER BY {watermark}'
+    if nrows is not None:
+        query = f'{query} LIMIT ?'
+        params.append(int(nrows))
+        
+    if chunksize is not None:
+        return _iter_sqlite_table(path, query, params, chunksize, mmap_size)
+    with closing(_connect_read_only(path, mmap_size)) as conn:
+        return pd.read_sql_query(query, conn, params = params)
+
+
+def _iter_sqlite_table(
+    path: str, 
+    query: str, 
+    params: list,
+    chunksize: int, 
+    mmap_size: int
+):
+    '''yields chunks of a sqlite query, closing the connection when done'''
+    
+    with closing(_connect_read_only(path, mmap_size)) as conn:
+        yield from pd.read_sql_query(
+            query, conn, params = params, chunksize = chunksize
+        )
+
+
+def _scan_sqlite(
+    path: str, 
+    read_options: dict,
+    tables: list = None,
+    table_options: dict = None,
+    watermark_path: str = None
+) -> list:
+    '''
+    - returns list of read tasks for tables in a sqlite database (all tables 
+    unless restricted to tables)
+    - table_options are set per table as in _set_file_options
+    - tables with a watermark continue from the value stored in 
+    watermark_path
+    - raises ValueError if a table lacks a requested column or watermark
+    '''
+    
+    if not dp.GetInfo.check_path_valid(path):
+        logger.debug('Please enter a valid path.')
+        return list()
+    try:
+        with closing(_connect_read_only(path)) as conn:
+            table_names = _fetch_table_names(conn)
+    except OperationalError:
+        logger.debug('WARNING: Failed to connect to database.')
+        return list()
+    if tables is not None:
+        table_names = [table for table in table_names if table in tables]
+        
+    tasks = [
+        (table, path, _read_sqlite_table, {'table': table, **read_options}) 
+        for table in table_names
+    ]
+    tasks = _set_file_options(tasks, table_options or dict())
+    with closing(_connect_read_only(path)) as conn:
+        for table, _, _, options in tasks:
+            _check_sqlite_columns(conn, table, options)
+    if watermark_path is not None:
+        stored = _load_watermarks(watermark_path, path)
+        for _, _, _, options in tasks:
+            recorded = stored.get(options['table'])
+            if recorded is not None \
+                    and recorded['column'] == options.get('watermark'):
+                options['since'] = recorded['value']
+    return tasks
+
+
+def _load_watermarks(watermark_path: str, path: str) -> dict:
+    '''returns stored {table: {'column', 'value'}} watermarks for database'''
+    
+    if not os.path.exists(watermark_path):
+        return dict()
+    with open(watermark_path) as file:
+        return json.load(file).get(os.path.abspath(path), dict())
+
+
+def _save_watermarks(watermark_path: str, path: str, watermarks: dict) -> None:
+    '''merges {table: {'column', 'value'}} watermarks for database into file'''
+    
+    stored = dict()
+    if os.path.exists(watermark_path):
+        with open(watermark_path) as file:
+            stored = json.load(file)
+    stored.setdefault(os.path.abspath(path), dict()).update(watermarks)
+    temp_path = f'{watermark_path}.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(stored, file, indent = 4, default = str)
+    os.replace(temp_path, watermark_path)
+
+
+def _pop_watermark(df: pd.DataFrame, current = None):
+    '''
+    removes WATERMARK_COLUMN from df in place, returns the larger of its 
+    maximum and current
+    '''
+    
+    values = df.pop(WATERMARK_COLUMN)
+    if values.empty:
+        return current
+    value = values.max()
+    value = value.item() if hasattr(value, 'item') else value
+    return value if current is None else max(value, current)
+
+
+def _infer_compact_dtypes(sample: pd.DataFrame) -> tuple:
+    '''
+    - returns (dtypes, date_formats) for reading a csv compactly, inferred 
+    from a sample of its rows
+    - string columns are parsed as dates only when every sampled value 
+    matches the single format guessed from the first, so month names, codes 
+    like '1/2' and words like 'now' are left as strings
+    - other string columns with at most half their values unique become 
+    categories
+    '''
+    
+    dtypes = dict()
+    date_formats = dict()
+    for col in sample.select_dtypes(include = ['object', 'string']).columns:
+        values = sample[col].dropna()
+        if values.empty:
+            continue
+        date_format = guess_datetime_format(str(values.iloc[0]))
+        if date_format is not None:
+            dates = pd.to_datetime(
+                values, format = date_format, errors = 'coerce'
+            )
+            if dates.notna().all():
+                date_formats[col] = date_format
+                continue
+        if values.nunique() <= len(values) / 2:
+            dtypes[col] = 'category'
+    return dtypes, date_formats
+
+
+def _read_csv_compact(
+    file_path: str, 
+    sample_rows: int = None, 
+    schema: dict = None, 
+    **kwargs
+) -> pd.DataFrame:
+    '''
+    - reads a csv directly into compact dtypes, taken from schema 
+    ({column: dtype}) or inferred from the first sample_rows rows
+    - integer columns are downcast after reading, as sampled integer dtypes 
+    would silently overflow on larger values later in the file
+    - reads with default dtypes if neither schema nor sample_rows are set
+    '''
+    
+    if schema is None and sample_rows is None:
+        return pd.read_csv(file_path, **kwargs)
+    if schema is None:
+        # the pyarrow engine cannot read a limited number of rows
+        sample_kwargs = {
+            key: value for key, value in kwargs.items() 
+            if key not in ('engine', 'nrows')
+        }
+        sample = pd.read_csv(
+            file_path, 
+            nrows = min(sample_rows, kwargs.get('nrows') or sample_rows), 
+            **sample_kwargs
+        )
+        dtypes, date_formats = _infer_compact_dtypes(sample)
+        parse_dates = list(date_formats)
+    else:
+        dtypes = {
+            col: dtype for col, dtype in schema.items() 
+            if not str(dtype).startswith('datetime')
+        }
+        parse_dates = [col for col in schema if col not in dtypes]
+        date_formats = None
+        
+    df = pd.read_csv(
+        file_path, 
+        dtype = dtypes, 
+        parse_dates = parse_dates, 
+        date_format = date_formats or None, 
+        **kwargs
+    )
+    for col in df.select_dtypes(include = 'int64').columns:
+        df[col] = pd.to_numeric(df[col], downcast = 'integer')
+    return df
+
+
+def _detect_encoding(sample: bytes) -> str:
+    '''
+    returns the encoding of a csv sample from its byte order mark, utf-8 if
+    it decodes as utf-8 and cp1252 (or latin-1) otherwise
+    '''
+    
+    for bom, encoding in ENCODING_BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # the sample may end part way through a multi-byte character
+        if e.reason == 'unexpected end of data':
+            return 'utf-8'
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _sniff_csv(file_path: str, sniff_bytes: int = 2 ** 14) -> dict:
+    '''
+    - returns pd.read_csv options (sep, quoting, header and encoding) for a
+    csv, detected from its first sniff_bytes bytes
+    - results are cached per file path, size and modified time so unchanged
+    files are only sniffed once per process
+    - files that cannot be sniffed get an empty dict (the pandas defaults)
+    '''
+    
+    stat = os.stat(file_path)
+    key = (
+        os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, sniff_bytes
+    )
+    if key in _SNIFF_CACHE:
+        return _SNIFF_CACHE[key]
+    
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in COMPRESSION_EXTENSIONS and extension not in SNIFF_OPENERS:
+        logger.debug(f'WARNING: cannot sniff {file_path}, using defaults')
+        return dict()
+    with SNIFF_OPENERS.get(extension, open)(file_path, 'rb') as file:
+        sample = file.read(sniff_bytes)
+    encoding = _detect_encoding(sample)
+    text = sample.decode(encoding, errors = 'ignore')
+    if len(sample) == sniff_bytes and '\n' in text:
+        # drops the last line as it is likely to be partial
+        text = text[:text.rindex('\n') + 1]
+        
+    read_options = {'encoding': encoding}
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(text, delimiters = SNIFF_DELIMITERS)
+    except csv.Error:
+        _SNIFF_CACHE[key] = read_options
+        return read_options
+    read_options.update({
+        'sep': dialect.delimiter,
+        'quotechar': dialect.quotechar,
+        'doublequote': dialect.doublequote
+    })
+    if dialect.escapechar is not None:
+        read_options['escapechar'] = dialect.escapechar
+    if dialect.skipinitialspace:
+        read_options['skipinitialspace'] = True
+    
+    # only treats the first row as data if it contains numbers, as the 
+    # header heuristic misjudges files of string columns
+    first_row = next(csv.reader(text.splitlines(), dialect), [])
+    has_numbers = any(
+        value.strip().lstrip('-').replace('.', '', 1).isdigit() 
+        for value in first_row
+    )
+    try:
+        if has_numbers and not sniffer.has_header(text):
+            read_options['header'] = None
+    except csv.Error:
+        pass
+    _SNIFF_CACHE[key] = read_options
+    return read_options
+
+
+def _set_sniffed_options(tasks: list, sniff_bytes: int = 2 ** 14) -> list:
+    '''
+    adds sniffed csv options to each task, keeping options already set on 
+    the task
+    '''
+    
+    resolved_tasks = list()
+    for filename, file_path, reader, read_options in tasks:
+        if os.path.isfile(file_path):
+            read_options = {
+                **_sniff_csv(file_path, sniff_bytes), **read_options
+            }
+        resolved_tasks.append((filename, file_path, reader, read_options))
+    return resolved_tasks
+
+
+def _read_sample(
+    file_path: str, 
+    sampled_reader, 
+    nrows: int = None, 
+    sample_fraction: float = None,
+    random_state: int = None,
+    **kwargs
+):
+    '''
+    - reads the first nrows rows, or a sample_fraction of rows, of a file 
+    with sampled_reader while reading as little of the file as possible
+    - parquet samples whole row groups, feather takes rows from a memory map,
+    csv parses evenly spaced byte ranges and sqlite uses LIMIT
+    - other readers (and compressed or irregular csv) read the whole file 
+    and keep the head or a random sample
+    '''
+    
+    if sampled_reader in ARROW_READERS:
+        # feather samples are always taken from a memory map
+        table = _sample_arrow(
+            file_path, 
+            'parquet' if sampled_reader is _read_parquet else 'feather', 
+            nrows, 
+            sample_fraction, 
+            random_state,
+            kwargs.get('columns'),
+            kwargs.get('filters')
+        )
+        return table if kwargs.get('as_arrow') else table.to_pandas()
+    
+    if nrows is not None:
+        if sampled_reader in (pd.read_csv, _read_csv_compact):
+            # the pyarrow engine cannot read a limited number of rows
+            kwargs.pop('engine', None)
+            return sampled_reader(file_path, nrows = nrows, **kwargs)
+        if sampled_reader in (_read_xlsx, _read_sqlite_table) \
+                or (sampled_reader is pd.read_json and kwargs.get('lines')):
+            kwargs.pop('engine', None)
+            return sampled_reader(file_path, nrows = nrows, **kwargs)
+    elif sampled_reader is pd.read_csv and kwargs.get('engine') is None:
+        try:
+            return _sample_csv(
+                file_path, sample_fraction, random_state, **kwargs
+            )
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as e:
+            logger.debug(f'WARNING: byte-range sampling failed ({e})')
+            
+    df = sampled_reader(file_path, **kwargs)
+    frames = df if isinstance(df, dict) else {None: df}
+    for sheet, frame in frames.items():
+        if nrows is not None:
+            frames[sheet] = frame.head(nrows)
+        else:
+            frames[sheet] = frame.sample(
+                frac = sample_fraction, random_state = random_state
+            ).sort_index()
+    return frames if isinstance(df, dict) else frames[None]
+
+
+def _sample_arrow(
+    file_path: str, 
+    file_format: str, 
+    nrows: int = None, 
+    sample_fraction: float = None,
+    random_state: int = None,
+    columns: list = None,
+    filters: list = None
+) -> pa.Table:
+    '''
+    returns the head of a parquet or feather file as a pyarrow table, or a 
+    sample_fraction of its parquet row groups or feather rows
+    '''
+    
+    expression = None if filters is None else pq.filters_to_expression(filters)
+    if nrows is not None:
+        return ds.dataset(file_path, format = file_format).head(
+            nrows, columns = columns, filter = expression
+        )
+    rng = random.Random(random_state)
+    if file_format == 'parquet':
+        parquet_file = pq.ParquetFile(file_path)
+        num_groups = parquet_file.num_row_groups
+        groups = sorted(rng.sample(
+            range(num_groups), max(1, math.ceil(num_groups * sample_fraction))
+        ))
+        table = parquet_file.read_row_groups(groups, columns = columns)
+        return table if expression is None else table.filter(expression)
+    table = feather.read_table(file_path, columns = columns, memory_map = True)
+    if expression is not None:
+        table = table.filter(expression)
+    rows = sorted(rng.sample(
+        range(table.num_rows), math.ceil(table.num_rows * sample_fraction)
+    ))
+    return table.take(rows)
+
+
+def _sample_csv(
+    file_path: str, 
+    sample_fraction: float, 
+    random_state: int = None,
+    blocks: int = 64,
+    **kwargs
+) -> pd.DataFrame:
+    '''
+    - parses a sample_fraction of a csv's bytes from evenly spaced blocks at 
+    random offsets, dropping the partial lines at each block's edges
+    - assumes a single header row and no newlines inside quoted values
+    '''
+    
+    if kwargs.get('compression') or file_path.endswith(COMPRESSION_EXTENSIONS):
+        raise ValueError('compressed files cannot be sampled by byte range')
+    rng = random.Random(random_state)
+    with open(file_path, 'rb') as file:
+        header = file.readline()
+        start = file.tell()
+        body_bytes = os.path.getsize(file_path) - start
+        if body_bytes * sample_fraction < blocks * 1024:
+            # small files are sampled as one block from the start
+            blocks = 1
+        block_bytes = max(1, int(body_bytes * sample_fraction / blocks))
+        stride = body_bytes / blocks
+        lines = [header]
+        for block in range(blocks):
+            offset = start + int(block * stride) \
+                + rng.randrange(max(1, int(stride) - block_bytes + 1))
+            file.seek(offset)
+            data = file.read(block_bytes)
+            if offset > start:
+                data = data.partition(b'\n')[2]
+            if not data.endswith(b'\n') and file.tell() < start + body_bytes:
+                data = data[:data.rfind(b'\n') + 1]
+            lines.append(data)
+    return pd.read_csv(io.BytesIO(b''.join(lines)), **kwargs)
+
+
+def _set_sampling(
+    tasks: list, 
+    nrows: int = None, 
+    sample_fraction: float = None,
+    random_state: int = None
+) -> list:
+    '''wraps the reader of each task to read only nrows or sample_fraction'''
+    
+    if nrows is None and sample_fraction is None:
+        return tasks
+    if nrows is not None and sample_fraction is not None:
+        raise ValueError('nrows and sample_fraction cannot both be set.')
+    if sample_fraction is not None and not 0 < sample_fraction <= 1:
+        raise ValueError(
+            'sample_fraction must be greater than 0 and at most 1.'
+        )
+    sample_options = _drop_none({
+        'nrows': nrows, 
+        'sample_fraction': sample_fraction, 
+        'random_state': random_state
+    })
+    resolved_tasks = list()
+    for filename, file_path, reader, read_options in tasks:
+        if reader is _read_partitioned:
+            read_options = {
+                **read_options, 
+                'reader': _read_sample, 
+                'sampled_reader': read_options['reader'],
+                **sample_options
+            }
+        else:
+            read_options = {
+                **read_options, 'sampled_reader': reader, **sample_options
+            }
+            reader = _read_sample
+        resolved_tasks.append((filename, file_path, reader, read_options))
+    return resolved_tasks
+
+
+# directory scan options accepted by all ReadData.read_all_* methods
+SCAN_OPTIONS = ('recursive', 'pattern', 'partitioning', 'partition_filters')
+
+# comparisons supported in hive partition filters
+PARTITION_OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    'in': lambda value, values: value in values,
+    'not in': lambda value, values: value not in values
+}
+
+# per-file stats recorded in DataDictionary.stats
+STATS_COLUMNS = (
+    'bytes', 'rows', 'columns', 'seconds', 'mb_per_second', 'memory_bytes'
+)
+
+# column used to return watermark values from sqlite reads
+WATERMARK_COLUMN = '__watermark__'
+
+# pyarrow-backed readers release the GIL so are scheduled on threads, all 
+# other readers are scheduled on processes by default
+THREAD_READERS = (_read_parquet, _read_feather)
+
+# calamine parses xlsx far faster than openpyxl but is an optional install
+XLSX_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') \
+    else 'openpyxl'
+
+# readers able to return pyarrow tables with as_arrow
+ARROW_READERS = (_read_parquet, _read_feather)
+
+# file extension and reader for each format read from directories
+FORMATS = {
+    'json': ('.json', pd.read_json),
+    'csv': ('.csv', pd.read_csv),
+    'xlsx': ('.xlsx', _read_xlsx),
+    'feather': ('.feather', _read_feather),
+    'parquet': ('.parquet', _read_parquet),
+    'pickle': ('.pickle', pd.read_pickle)
+}
+
+# formats whose readers decompress files while parsing them
+COMPRESSED_FORMATS = ('json', 'csv', 'pickle')
+COMPRESSION_EXTENSIONS = ('.gz', '.bz2', '.zst', '.xz', '.zip')
+FORMATS_BY_EXTENSION = {
+    extension: fmt for fmt, (extension, _) in FORMATS.items()
+}
+
+# leading bytes identifying the format of files without an extension
+MAGIC_BYTES = {
+    b'PAR1': 'parquet',
+    b'ARROW1': 'feather',
+    b'FEA1': 'feather',
+    b'PK\x03\x04': 'xlsx',
+    b'\x80': 'pickle',
+    b'{': 'json',
+    b'[': 'json'
+}
+
+# byte order marks identifying the encoding of csv files, longest first
+ENCODING_BOMS = (
+    (b'\xff\xfe\x00\x00', 'utf-32'),
+    (b'\x00\x00\xfe\xff', 'utf-32'),
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16')
+)
+
+# delimiters considered when sniffing csv dialects
+SNIFF_DELIMITERS = ',;\t|'
+
+# openers for compressed csv files that can be sniffed
+SNIFF_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+# sniffed csv options per (path, size, modified time, sniff_bytes)
+_SNIFF_CACHE = dict()
+
+
+class DataDictionary(dict):
+    '''
+    - dictionary of dataframes returned by ReadData, failed reads are 
+    recorded in 'errors' as {name: exception} rather than aborting the batch
+    - 'stats' holds a dataframe of per-file bytes, rows, columns, parse 
+    seconds, throughput (mb_per_second) and in-memory bytes
+    '''
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.errors = dict()
+        self.stats = _stats_frame(dict())
+
+
+def _stats_frame(records: dict) -> pd.DataFrame:
+    '''returns per-file read stats {name: record} as a dataframe'''
+    
+    return pd.DataFrame.from_dict(
+        records, orient = 'index', columns = list(STATS_COLUMNS)
+    )
+
+
+def _read_stats(task: tuple, df, seconds: float) -> dict:
+    '''
+    returns read stats for a task: bytes on disk (None for sqlite tables), 
+    rows, columns, parse seconds, throughput and in-memory bytes
+    '''
+    
+    _, file_path, reader, read_options = task
+    file_bytes = None if reader is _read_sqlite_table \
+        else os.path.getsize(file_path)
+    # multi-sheet workbooks are read as {sheet: dataframe}
+    frames = list(df.values()) if isinstance(df, dict) else [df]
+    memory_bytes = sum(
+        frame.nbytes if isinstance(frame, pa.Table) 
+        else int(frame.memory_usage(index = True, deep = True).sum())
+        for frame in frames
+    )
+    return {
+        'bytes': file_bytes,
+        'rows': sum(len(frame) for frame in frames),
+        'columns': max((len(frame.columns) for frame in frames), default = 0),
+        'seconds': seconds,
+        'mb_per_second': None if file_bytes is None or not seconds 
+            else file_bytes / 1e6 / seconds,
+        'memory_bytes': memory_bytes
+    }
+
+
+def _read_timed(task: tuple, cache = None) -> tuple:
+    '''reads a task, returns (df, read stats)'''
+    
+    start = time.perf_counter()
+    df = _read_task(task, cache)
+    return df, _read_stats(task, df, time.perf_counter() - start)
+
+
+def _fingerprint_value(value) -> str:
+    '''
+    returns a stable representation of a read option, naming functions by
+    module and qualified name rather than their memory address
+    '''
+    
+    qualname = getattr(value, '__qualname__', None)
+    if callable(value) and qualname is not None:
+        return f'{value.__module__}.{qualname}'
+    return repr(value)
+
+
+class ReadCache:
+    '''
+    - on-disk cache of parsed dataframes stored as parquet, so unchanged 
+    slow-to-parse files (csv, xlsx, json) are only parsed once
+    - entries are keyed by file path, size, modified time and read options
+    - the least recently used entries are evicted once the cache exceeds 
+    max_bytes
+    '''
+    
+    def __init__(self, cache_dir: str, max_bytes: int = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok = True)
+        
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()[:16]
+        
+    def _entry_path(
+        self, 
+        file_path: str, 
+        reader, 
+        read_options: dict
+    ) -> str:
+        '''
+        returns cache entry path for the current version of a file, named 
+        {path hash}_{size and modified time hash}_{read options hash}
+        '''
+        
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        version = json.dumps([stat.st_size, stat.st_mtime_ns])
+        fingerprint = json.dumps([
+            _fingerprint_value(reader),
+            repr(sorted(
+                (option, _fingerprint_value(value)) 
+                for option, value in read_options.items()
+            ))
+        ])
+        return os.path.join(
+            self.cache_dir,
+            f'{self._hash(file_path)}_{self._hash(version)}'
+            f'_{self._hash(fingerprint)}.parquet'
+        )
+    
+    def get(
+        self, 
+        file_path: str, 
+        reader, 
+        read_options: dict
+    ) -> pd.DataFrame:
+        '''
+        returns cached dataframe (or pyarrow table for as_arrow reads, or 
+        {sheet: dataframe} for multi-sheet workbooks) for file or None if 
+        not cached
+        '''
+        
+        entry_path = self._entry_path(file_path, reader, read_options)
+        read = pq.read_table if read_options.get('as_arrow') \
+            else pd.read_parquet
+        try:
+            if os.path.exists(entry_path):
+                df = read(entry_path)
+                used_paths = [entry_path]
+            else:
+                # sheets are stored one per entry, named in their metadata
+                sheet_paths = self._sheet_paths(entry_path)
+                df = dict()
+                for sheet_path in sheet_paths:
+                    metadata = pq.read_schema(sheet_path).metadata
+                    df[metadata[b'dpyp_sheet'].decode()] = read(sheet_path)
+                used_paths = sheet_paths
+            # modified time records last use for eviction
+            for used_path in used_paths:
+                os.utime(used_path)
+        except (OSError, KeyError, TypeError, pa.ArrowException):
+            return None
+        return df
+    
+    @staticmethod
+    def _sheet_paths(entry_path: str) -> list:
+        '''
+        returns the entry paths of every cached sheet of a workbook, raising 
+        FileNotFoundError if any were evicted
+        '''
+        
+        base_path = entry_path[:-len('.parquet')]
+        first_path = f'{base_path}-0.parquet'
+        metadata = pq.read_schema(first_path).metadata
+        sheet_paths = [
+            f'{base_path}-{i}.parquet' 
+            for i in range(int(metadata[b'dpyp_sheets']))
+        ]
+        for sheet_path in sheet_paths:
+            if not os.path.exists(sheet_path):
+                raise FileNotFoundError(sheet_path)
+        return sheet_paths
+    
+    def put(
+        self, 
+        file_path: str, 
+        reader, 
+        read_options: dict, 
+        df: pd.DataFrame
+    ) -> None:
+        '''
+        stores dataframe, pyarrow table or {sheet: dataframe} for file, 
+        removing entries for older versions of the file (entries for other 
+        tables or read options of the current version are kept)
+        '''
         
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
+        entry_path = self._entry_path(file_path, reader, read_options)
+        self._remove_stale(entry_path)
+        if isinstance(df, dict):
+            base_path = entry_path[:-len('.parquet')]
+            entries = [
+                (f'{base_path}-{i}.parquet', sheet, frame) 
+                for i, (sheet, frame) in enumerate(df.items())
+            ]
         else:
-            logger.debug('Please enter a valid path.')
+            entries = [(entry_path, None, df)]
             
-        for file in files:
-            if file.endswith('.json'):
-                df = pd.read_json(os.path.join(path, file))
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
+        written = list()
+        temp_path = None
+        try:
+            for part_path, sheet, frame in entries:
+                table = frame if isinstance(frame, pa.Table) \
+                    else pa.Table.from_pandas(frame)
+                if sheet is not None:
+                    table = table.replace_schema_metadata({
+                        **(table.schema.metadata or dict()),
+                        b'dpyp_sheet': str(sheet).encode(),
+                        b'dpyp_sheets': str(len(entries)).encode()
+                    })
+                temp_path = f'{part_path}.{os.getpid()}.tmp'
+                pq.write_table(table, temp_path)
+                os.replace(temp_path, part_path)
+                written.append(part_path)
+        except Exception as e:
+            logger.debug(f'WARNING: failed to cache {file_path} ({e})')
+            for part_path in [temp_path, *written]:
+                if part_path is not None and os.path.exists(part_path):
+                    os.remove(part_path)
+            return
+        self.evict()
+    
+    def _remove_stale(self, entry_path: str) -> None:
+        '''
+        removes entries for the same file as entry_path whose size and 
+        modified time differ
+        '''
+        
+        path_hash, version_hash = os.path.basename(entry_path).split('_')[:2]
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.parquet'):
+                continue
+            hashes = entry.name.split('_')[:2]
+            if hashes[0] == path_hash and hashes[1:] != [version_hash]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+    
+    def invalidate(self, file_path: str = None) -> None:
+        '''removes cached entries for file, or all entries if not given'''
+        
+        prefix = '' if file_path is None \
+            else self._hash(os.path.abspath(file_path))
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(prefix) \
+                    and entry.name.endswith('.parquet'):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+    
+    def evict(self) -> None:
+        '''removes least recently used entries until within max_bytes'''
+        
+        if self.max_bytes is None:
+            return
+        entries = list()
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.parquet'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+
+def _task_keys(task: tuple) -> list:
+    '''
+    returns the data dictionary keys a read task produces, 'workbook.sheet' 
+    for each sheet of workbooks read with sheets (listed from the workbook 
+    without parsing it when sheets = 'all')
+    '''
+    
+    filename, file_path, _, read_options = task
+    sheets = read_options.get('sheets')
+    if sheets is None:
+        return [filename]
+    if sheets == 'all':
+        try:
+            with pd.ExcelFile(
+                file_path, engine = read_options.get('engine')
+            ) as workbook:
+                sheets = workbook.sheet_names
+        except Exception as e:
+            logger.debug(f'WARNING: failed to list sheets of {filename} ({e})')
+            return [filename]
+    elif isinstance(sheets, str):
+        sheets = [sheets]
+    return [f'{filename}.{sheet}' for sheet in sheets]
+
+
+class LazyDataDictionary(Mapping):
+    '''
+    read-only data dictionary whose keys are known from the directory scan 
+    and whose dataframes are read on first access and cached
+    '''
+    
+    def __init__(
+        self, 
+        tasks: list, 
+        messaging: bool = True, 
+        read_cache: ReadCache = None
+    ):
+        self._tasks = {
+            key: task for task in tasks for key in _task_keys(task)
+        }
+        self._cache = dict()
+        self._read_cache = read_cache
+        self._stats = dict()
+        self.messaging = messaging
+        self.errors = dict()
+        
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        if key not in self._cache:
+            task = self._tasks[key]
+            try:
+                df, stats = _read_timed(task, self._read_cache)
+            except Exception as e:
+                self.errors[key] = e
+                logger.debug(f'WARNING: failed to read {key} ({e})')
+                raise
+            # every sheet of a workbook is kept from its single read
+            self._cache.update(_split_sheets(task[0], df))
+            self._stats[task[0]] = stats
+            if self.messaging:
+                _log_read(task[0], stats)
+        return self._cache[key]
+    
+    def __iter__(self):
+        return iter(self._tasks)
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
+    
+    def __repr__(self) -> str:
+        return (
+            f'LazyDataDictionary({list(self._tasks)}, '
+            f'loaded = {list(self._cache)})'
+        )
+    
+    @property
+    def stats(self) -> pd.DataFrame:
+        '''read stats of the files loaded so far'''
+        
+        return _stats_frame(self._stats)
+    
+    def is_loaded(self, key: str) -> bool:
+        '''returns True if key has already been read'''
+        
+        return key in self._cache
+
+
+def _detect_format(file_path: str) -> str:
+    '''returns format of a file from its leading bytes, or None if unknown'''
+    
+    try:
+        with open(file_path, 'rb') as file:
+            head = file.read(8).lstrip()
+    except OSError:
+        return None
+    for magic, file_format in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return file_format
+    return None
+
+
+def _parse_partition(dirname: str) -> tuple:
+    '''
+    returns (key, value) for a hive partition directory name ('key=value'), 
+    or None, numeric values are converted to numbers
+    '''
+    
+    key, separator, value = dirname.partition('=')
+    if not separator or not key:
+        return None
+    for convert in (int, float):
+        try:
+            return key, convert(value)
+        except ValueError:
+            pass
+    return key, value
+
+
+def _match_partition_filters(partitions: dict, filters: list) -> bool:
+    '''
+    - returns False if partitions cannot satisfy filters (pyarrow DNF, a list
+    of (key, op, value) or a list of such lists combined with or)
+    - conditions on keys not in partitions are assumed to match, so partly 
+    known partitions are only rejected when no conjunction can match
+    '''
+    
+    if not filters:
+        return True
+    conjunctions = filters if isinstance(filters[0], list) else [filters]
+    for conjunction in conjunctions:
+        matched = True
+        for key, op, value in conjunction:
+            if key not in partitions:
+                continue
+            compare = PARTITION_OPERATORS[op]
+            try:
+                matched = compare(partitions[key], value)
+            except TypeError:
+                matched = compare(str(partitions[key]), str(value))
+            if not matched:
+                break
+        if matched:
+            return True
+    return False
+
+
+def _walk_files(
+    path: str, 
+    recursive: bool = False, 
+    partitioning: str = None,
+    partition_filters: list = None,
+    partitions: dict = None
+):
+    '''
+    - yields (entry, partitions) for files in path, descending into 
+    subdirectories if recursive
+    - with hive partitioning, 'key=value' directories are always descended 
+    into and parsed into partitions, and those not matching 
+    partition_filters are skipped without being listed
+    '''
+    
+    partitions = partitions or dict()
+    with os.scandir(path) as entries:
+        entries = sorted(entries, key = lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_file():
+            yield entry, partitions
+        elif entry.is_dir():
+            sub_partitions = partitions
+            partition = _parse_partition(entry.name) \
+                if partitioning == 'hive' else None
+            if partition is None and not recursive:
+                continue
+            if partition is not None:
+                sub_partitions = {**partitions, partition[0]: partition[1]}
+                if not _match_partition_filters(
+                    sub_partitions, partition_filters
+                ):
+                    continue
+            yield from _walk_files(
+                entry.path, 
+                recursive, 
+                partitioning, 
+                partition_filters, 
+                sub_partitions
+            )
+
+
+def _strip_partition_filters(filters: list, partitions: dict) -> tuple:
+    '''
+    - returns (filters, matched) for a file in partitions, where filters 
+    (pyarrow DNF) no longer test partition keys, which are not columns of 
+    the file
+    - conjunctions the partitions fail are dropped, matched is False if none 
+    are left, and filters is None if a conjunction only tested partitions
+    '''
+    
+    if not filters:
+        return filters, True
+    conjunctions = filters if isinstance(filters[0], list) else [filters]
+    stripped = list()
+    for conjunction in conjunctions:
+        if not _match_partition_filters(partitions, conjunction):
+            continue
+        conjunction = [
+            condition for condition in conjunction 
+            if condition[0] not in partitions
+        ]
+        if not conjunction:
+            return None, True
+        stripped.append(conjunction)
+    return stripped or None, bool(stripped)
+
+
+def _read_partitioned(
+    file_path: str, 
+    reader, 
+    partitions: dict, 
+    **kwargs
+):
+    '''
+    reads a file with reader and adds its partitions as columns, filters on 
+    partition keys are applied to the partitions rather than the file
+    '''
+    
+    filters, matched = _strip_partition_filters(
+        kwargs.pop('filters', None), partitions
+    )
+    if filters is not None:
+        kwargs['filters'] = filters
+    df = reader(file_path, **kwargs)
+    if not matched:
+        df = df.slice(0, 0) if isinstance(df, pa.Table) else df.iloc[:0]
+    for key, value in partitions.items():
+        if isinstance(df, pa.Table):
+            df = df.append_column(key, pa.array([value] * df.num_rows))
+        else:
+            df[key] = value
+    return df
+
+
+def _pop_scan_options(options: dict, filters: list = None) -> dict:
+    '''
+    removes and returns directory scan options from loader options, row 
+    filters (unless set per file) also prune hive partition directories 
+    when no partition_filters are given
+    '''
+    
+    scan_options = {
+        option: options.pop(option) for option in SCAN_OPTIONS 
+        if option in options
+    }
+    if isinstance(filters, list):
+        scan_options.setdefault('partition_filters', filters)
+    return scan_options
+
+
+def _scan_files(
+    path: str, 
+    read_options: dict, 
+    detect: bool = False,
+    recursive: bool = False,
+    pattern: str = None,
+    partitioning: str = None,
+    partition_filters: list = None
+) -> list:
+    '''
+    - returns sorted list of read tasks (name, file_path, reader, options) for
+    files in path in a single directory scan
+    - read_options maps each format to read to the options for its reader
+    - files without an extension are identified by their leading bytes if 
+    detect is set
+    - recursive includes files in subdirectories, named by their relative 
+    path (e.g. 'year=2024/part-0'), and pattern only includes files whose 
+    relative path matches a glob pattern (e.g. '*/part-*.parquet')
+    - partitioning = 'hive' reads 'key=value' directories (recursive or 
+    not), adds them as columns and prunes directories not matching 
+    partition_filters before listing them
+    - compressed json, csv and pickle files (e.g. 'a.csv.gz') are included 
+    and named without either extension
+    - names shared by several files (e.g. 'a.csv' and 'a.parquet') keep their
+    extension
+    '''
+    
+    if not dp.GetInfo.check_path_valid(path):
+        logger.debug('Please enter a valid path.')
+        return list()
+    
+    extensions = {FORMATS[fmt][0]: fmt for fmt in read_options}
+    matches = list()
+    for entry, partitions in _walk_files(
+        path, recursive, partitioning, partition_filters
+    ):
+        relative_path = os.path.relpath(entry.path, path).replace(os.sep, '/')
+        if pattern is not None and not fnmatch.fnmatch(relative_path, pattern):
+            continue
+        filename, extension = os.path.splitext(relative_path)
+        if extension in COMPRESSION_EXTENSIONS:
+            # compressed files are decompressed by the reader as it parses
+            filename, extension = os.path.splitext(filename)
+            if FORMATS_BY_EXTENSION.get(extension) not in COMPRESSED_FORMATS:
+                continue
+        if extension:
+            file_format = extensions.get(extension)
+        elif detect:
+            file_format = _detect_format(entry.path)
+            file_format = file_format if file_format in read_options \
+                else None
+        else:
+            file_format = None
+        if file_format is not None:
+            matches.append(
+                (filename, relative_path, entry, file_format, partitions)
+            )
             
-        return data_dictionary
+    filenames = [match[0] for match in matches]
+    tasks = list()
+    for filename, relative_path, entry, file_format, partitions in matches:
+        if filenames.count(filename) > 1:
+            filename = relative_path
+        reader = FORMATS[file_format][1]
+        options = read_options[file_format] or dict()
+        if partitions:
+            options = {'reader': reader, 'partitions': partitions, **options}
+            reader = _read_partitioned
+        tasks.append((filename, entry.path, reader, options))
+    return sorted(tasks, key = lambda task: task[0])
+
+
+def _format_options(formats: list = None, read_options: dict = None) -> dict:
+    '''
+    returns {format: reader options} for formats (default all in FORMATS), 
+    raising ValueError for unsupported formats
+    '''
+    
+    formats = FORMATS if formats is None else formats
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'Unsupported formats: {sorted(unknown)}')
+    read_options = read_options or dict()
+    return {fmt: read_options.get(fmt) for fmt in formats}
+
+
+def _set_reader(tasks: list, reader) -> list:
+    '''replaces the reader of each task, keeping any partition wrapper'''
+    
+    resolved_tasks = list()
+    for filename, file_path, task_reader, read_options in tasks:
+        if task_reader is _read_partitioned:
+            read_options = {**read_options, 'reader': reader}
+        else:
+            task_reader = reader
+        resolved_tasks.append((filename, file_path, task_reader, read_options))
+    return resolved_tasks
+
+
+def _drop_none(read_options: dict) -> dict:
+    '''returns read options without those set to None'''
+    
+    return {
+        option: value for option, value in read_options.items() 
+        if value is not None
+    }
+
+
+def _set_file_options(
+    tasks: list, 
+    file_options: dict, 
+    readers: tuple = None
+) -> list:
+    '''
+    - adds options to the reader options of each task, skipping None values
+    - a dict value is treated as per-file options keyed by name, any other 
+    value applies to every file
+    - if readers is given, only tasks using one of readers are changed
+    '''
+    
+    resolved_tasks = list()
+    for filename, file_path, reader, read_options in tasks:
+        if readers is not None \
+                and read_options.get('reader', reader) not in readers:
+            resolved_tasks.append((filename, file_path, reader, read_options))
+            continue
+        read_options = dict(read_options)
+        for option, value in file_options.items():
+            if isinstance(value, dict):
+                value = value.get(filename)
+            if value is not None:
+                read_options[option] = value
+        resolved_tasks.append((filename, file_path, reader, read_options))
+    return resolved_tasks
+
+
+def _hash_file(file_path: str) -> str:
+    '''returns blake2b hash of file contents, read in 1 MiB blocks'''
+    
+    file_hash = hashlib.blake2b()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _filter_changed(
+    tasks: list, 
+    manifest: str, 
+    hash_contents: bool = False
+) -> tuple:
+    '''
+    - returns tasks for files that are new or changed since they were last
+    recorded in the manifest, and their current manifest entries
+    - files whose size or modified time differ but whose content hash 
+    matches are treated as unchanged if hash_contents is set
+    '''
+    
+    previous = dict()
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            previous = json.load(file)
+            
+    changed_tasks = list()
+    entries = dict()
+    for task in tasks:
+        file_path = os.path.abspath(task[1])
+        stat = os.stat(file_path)
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        recorded = previous.get(file_path)
+        if recorded is not None \
+                and recorded['size'] == entry['size'] \
+                and recorded['mtime_ns'] == entry['mtime_ns']:
+            continue
+        if hash_contents:
+            entry['hash'] = _hash_file(file_path)
+            if recorded is not None and recorded.get('hash') == entry['hash']:
+                entries[file_path] = entry
+                continue
+        changed_tasks.append(task)
+        entries[file_path] = entry
+    return changed_tasks, entries
+
+
+def _update_manifest(manifest: str, entries: dict) -> None:
+    '''merges entries into the manifest, replacing it atomically'''
+    
+    recorded = dict()
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            recorded = json.load(file)
+    recorded.update(entries)
+    temp_path = f'{manifest}.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(recorded, file, indent = 4)
+    os.replace(temp_path, manifest)
+
+
+def _read_task(task: tuple, cache: ReadCache = None) -> pd.DataFrame:
+    '''reads a single file from a read task, using cache if given'''
+    
+    _, file_path, reader, read_options = task
+    if cache is None:
+        return reader(file_path, **read_options)
+    df = cache.get(file_path, reader, read_options)
+    if df is None:
+        df = reader(file_path, **read_options)
+        cache.put(file_path, reader, read_options, df)
+    return df
+
+
+def _load_files(
+    tasks: list,
+    messaging: bool = True,
+    max_workers: int = None,
+    executor = None,
+    lazy: bool = False,
+    cache: Union[ReadCache, str] = None,
+    manifest: str = None,
+    hash_contents: bool = False,
+    combine: bool = False,
+    source_column: str = None,
+    nrows: int = None,
+    sample_fraction: float = None,
+    random_state: int = None
+) -> DataDictionary:
+    '''
+    - reads all tasks into a data dictionary in task order
+    - reads serially by default, or concurrently if max_workers or executor 
+    is set
+    - executor may be 'thread', 'process' or an existing 
+    concurrent.futures.Executor (which is not shut down), by default threads 
+    are used for pyarrow-backed readers and processes for all others
+    - failed reads are logged and recorded in DataDictionary.errors
+    - if lazy is set, a LazyDataDictionary is returned instead and nothing is
+    read until a key is accessed
+    - cache (a ReadCache or cache directory) serves unchanged files from a 
+    parquet copy of their previous parse
+    - manifest (a json file path) restricts reads to files that are new or 
+    changed since the previous call with the same manifest, optionally 
+    comparing content hashes, and records the files read successfully
+    - if combine is set, a single dataframe of all files is returned instead,
+    with each file's name in source_column if given
+    - nrows reads only the head of each file and sample_fraction a sample of
+    its rows (see _read_sample), seeded by random_state
+    '''
+    
+    if manifest is not None and (
+        nrows is not None or sample_fraction is not None
+    ):
+        raise ValueError('manifest cannot be used with sampled reads.')
+    tasks = _set_sampling(tasks, nrows, sample_fraction, random_state)
+    if isinstance(cache, str):
+        cache = ReadCache(cache)
+    if manifest is not None:
+        if lazy:
+            raise ValueError('manifest cannot be used with lazy reads.')
+        tasks, entries = _filter_changed(tasks, manifest, hash_contents)
+    if lazy:
+        if combine:
+            raise ValueError('combine cannot be used with lazy reads.')
+        return LazyDataDictionary(tasks, messaging, cache)
+    if combine:
+        # arrow-backed readers skip the per-file pandas conversion
+        tasks = _set_file_options(tasks, {'as_arrow': True}, ARROW_READERS)
+    
+    data_dictionary = DataDictionary()
+    tables = list()
+    stats = dict()
+    names = [task[0] for task in tasks]
+    with ExitStack() as stack:
+        results = _read_results(tasks, cache, max_workers, executor, stack)
+        for filename, (result, error) in zip(names, results):
+            if error is not None:
+                data_dictionary.errors[filename] = error
+                logger.debug(f'WARNING: failed to read {filename} ({error})')
+                continue
+            df, stats[filename] = result
+            if messaging:
+                _log_read(filename, stats[filename])
+            frames = _split_sheets(filename, df)
+            del df
+            for name, frame in frames.items():
+                if combine:
+                    tables.append(_to_arrow(frame, name, source_column))
+                else:
+                    data_dictionary[name] = frame
+            del frames
+            
+    if manifest is not None:
+        # failed files are left out so they are retried on the next call
+        failed_paths = {
+            os.path.abspath(task[1]) 
+            for task in tasks if task[0] in data_dictionary.errors
+        }
+        _update_manifest(manifest, {
+            file_path: entry for file_path, entry in entries.items() 
+            if file_path not in failed_paths
+        })
+    if combine:
+        return _combine_tables(
+            tables, data_dictionary.errors, stats, messaging, source_column
+        )
+    data_dictionary.stats = _stats_frame(stats)
+    if not data_dictionary:
+        logger.debug('No files read.')
+    return data_dictionary
+
+
+def _split_sheets(filename: str, df) -> dict:
+    '''
+    returns {name: dataframe} for a read result, naming each sheet of a 
+    multi-sheet workbook 'workbook.sheet'
+    '''
+    
+    if isinstance(df, dict):
+        return {f'{filename}.{sheet}': frame for sheet, frame in df.items()}
+    return {filename: df}
+
+
+def _log_read(filename: str, stats: dict) -> None:
+    '''logs records, parse time and throughput of a read'''
+    
+    message = f'read {filename} ({stats["rows"]:,} records'
+    message += f', {stats["seconds"]:.2f}s'
+    if stats['mb_per_second'] is not None:
+        message += f', {stats["mb_per_second"]:.1f} MB/s'
+    logger.debug(f'{message})')
+
+
+def _read_results(
+    tasks: list, 
+    cache: ReadCache, 
+    max_workers: int, 
+    executor, 
+    stack: ExitStack
+):
+    '''
+    returns iterator of ((df, stats), error) for tasks in task order, any pool
+    created is shut down when stack exits
+    '''
+    
+    if max_workers is None and executor is None:
+        return _read_serial(tasks, cache)
+    if isinstance(executor, Executor):
+        return _read_concurrent(tasks, executor, cache)
+    if executor is None:
+        thread_safe = all(
+            task[3].get('reader', task[2]) in THREAD_READERS 
+            for task in tasks
+        )
+        executor = 'thread' if thread_safe else 'process'
+    if executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers = max_workers)
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(max_workers = max_workers)
+    else:
+        raise ValueError(
+            "executor must be 'thread', 'process' or an Executor."
+        )
+    return _read_concurrent(tasks, stack.enter_context(pool), cache)
+
+
+def _to_arrow(df, name: str, source_column: str = None) -> pa.Table:
+    '''
+    - returns df as a pyarrow table, with name as a dictionary-encoded 
+    source_column if given (unified into one categorical once combined)
+    - an unnamed range index is dropped, other indexes are kept as columns
+    and restored as the index of the combined frame
+    '''
+    
+    if isinstance(df, pa.Table):
+        table = df
+    else:
+        default_index = isinstance(df.index, pd.RangeIndex) \
+            and df.index.names == [None]
+        table = pa.Table.from_pandas(df, preserve_index = not default_index)
+    if source_column is not None:
+        indices = pa.array([0] * table.num_rows, pa.int32())
+        table = table.append_column(
+            source_column, 
+            pa.DictionaryArray.from_arrays(indices, pa.array([name]))
+        )
+    return table
+
+
+def _combine_tables(
+    tables: list, 
+    errors: dict, 
+    stats: dict,
+    messaging: bool = True,
+    source_column: str = None
+) -> pd.DataFrame:
+    '''
+    - concatenates tables once and converts to a single dataframe, releasing 
+    arrow memory as columns are converted, errors and per-file read stats 
+    are kept in attrs
+    - columns whose types differ between files are widened (e.g. int64 to 
+    float64), and tables are concatenated as dataframes instead if a column 
+    cannot be widened (e.g. int64 and string)
+    '''
+    
+    if not tables:
+        logger.debug('No files read.')
+        df = pd.DataFrame()
+    else:
+        try:
+            combined = pa.concat_tables(tables, promote_options = 'permissive')
+        except (pa.ArrowTypeError, pa.ArrowInvalid) as e:
+            logger.debug(f'WARNING: combining as dataframes ({e})')
+            df = _concat_frames(tables, source_column)
+        else:
+            tables.clear()
+            df = combined.to_pandas(split_blocks = True, self_destruct = True)
+            del combined
+        if messaging:
+            logger.debug(f'combined {len(df):,} records')
+    df.attrs['errors'] = {name: str(error) for name, error in errors.items()}
+    df.attrs['stats'] = stats
+    return df
+
+
+def _concat_frames(tables: list, source_column: str = None) -> pd.DataFrame:
+    '''
+    converts tables to dataframes one at a time and concatenates them, 
+    keeping source_column categorical
+    '''
+    
+    frames = list()
+    while tables:
+        frames.append(tables.pop(0).to_pandas())
+    df = pd.concat(
+        frames, 
+        ignore_index = all(
+            isinstance(frame.index, pd.RangeIndex) for frame in frames
+        )
+    )
+    del frames
+    if source_column is not None:
+        df[source_column] = df[source_column].astype('category')
+    return df
+
+
+def _read_serial(tasks: list, cache: ReadCache = None):
+    '''reads tasks one after another, yielding ((df, stats), error)'''
+    
+    for task in tasks:
+        try:
+            result = _read_timed(task, cache)
+        except Exception as e:
+            yield None, e
+            continue
+        yield result, None
+
+
+def _read_concurrent(
+    tasks: list, 
+    pool: Executor, 
+    cache: ReadCache = None
+):
+    '''
+    submits all tasks to pool, yielding ((df, stats), error) in task order 
+    and releasing each result once yielded
+    '''
+    
+    futures = [pool.submit(_read_timed, task, cache) for task in tasks]
+    for i in range(len(futures)):
+        future = futures[i]
+        futures[i] = None
+        try:
+            result = future.result()
+        except Exception as e:
+            yield None, e
+            continue
+        del future
+        yield result, None
+
+
+async def _aload_files(
+    tasks: list,
+    messaging: bool = True,
+    max_concurrency: int = 4,
+    executor: Executor = None,
+    cache: Union[ReadCache, str] = None
+) -> DataDictionary:
+    '''
+    - reads all tasks into a data dictionary without blocking the event loop,
+    with at most max_concurrency files read at once
+    - reads run on executor if given (which is not shut down), otherwise on a
+    thread pool of max_concurrency workers
+    - cancelling the coroutine cancels all reads that have not yet started
+    '''
+    
+    if isinstance(cache, str):
+        cache = ReadCache(cache)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pool = executor or ThreadPoolExecutor(max_workers = max_concurrency)
+    
+    async def read(task: tuple) -> tuple:
+        async with semaphore:
+            try:
+                result = await loop.run_in_executor(
+                    pool, _read_timed, task, cache
+                )
+            except Exception as e:
+                return None, e
+            return result, None
+    
+    try:
+        results = await asyncio.gather(*(read(task) for task in tasks))
+    finally:
+        if executor is None:
+            pool.shutdown(wait = False, cancel_futures = True)
+            
+    data_dictionary = DataDictionary()
+    stats = dict()
+    for (filename, *_), (result, error) in zip(tasks, results):
+        if error is not None:
+            data_dictionary.errors[filename] = error
+            logger.debug(f'WARNING: failed to read {filename} ({error})')
+            continue
+        df, stats[filename] = result
+        data_dictionary.update(_split_sheets(filename, df))
+        if messaging:
+            _log_read(filename, stats[filename])
+    data_dictionary.stats = _stats_frame(stats)
+    if not data_dictionary:
+        logger.debug('No files read.')
+    return data_dictionary
+
+
+def _stream_files(tasks: list, messaging: bool = True):
+    '''
+    yields (name, chunk) pairs from tasks read with a chunksize, failed files
+    are logged and skipped
+    '''
+    
+    for task in tasks:
+        filename = task[0]
+        records = 0
+        try:
+            with closing(_read_task(task)) as reader:
+                for chunk in reader:
+                    records += len(chunk)
+                    yield filename, chunk
+        except Exception as e:
+            logger.debug(f'WARNING: failed to read {filename} ({e})')
+            continue
+        if messaging:
+            logger.debug(f'streamed {filename} ({records:,} records)')
+
+
+class ReadData:
+    '''
+    - contains functionality for reading data from various file formats
+    - read_all_* methods accept max_workers and executor to load files 
+    concurrently, lazy to defer reading each file until first access, cache
+    to reuse previous parses of unchanged files, and manifest to only read 
+    files that are new or changed since the previous call
+    - read_all_* methods also accept recursive, pattern, partitioning and 
+    partition_filters to read nested and hive-partitioned directories
+    - combine returns one dataframe of all files (optionally with the file 
+    name in source_column) built from a single arrow concatenation
+    - nrows and sample_fraction read only the head or a sample of each file
+    for quick diagnostics
+    '''
+    
+    @staticmethod
+    def read_all(
+        path: str,
+        formats: list = None,
+        read_options: dict = None,
+        messaging: bool = True,
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all supported files from directory in a single scan and 
+        assigns to dataframes
+        - formats restricts which formats are read (default all in FORMATS)
+        - read_options passes reader options per format, e.g. 
+        {'csv': {'sep': ';'}}
+        - files without an extension are identified by their leading bytes
+        '''
+        
+        tasks = _scan_files(
+            path, 
+            _format_options(formats, read_options), 
+            detect = True,
+            **_pop_scan_options(options)
+        )
+        return _load_files(tasks, messaging, **options)
+    
+    @staticmethod
+    async def aread_all(
+        path: str,
+        formats: list = None,
+        read_options: dict = None,
+        max_concurrency: int = 4,
+        executor: Executor = None,
+        cache: Union[ReadCache, str] = None,
+        messaging: bool = True,
+        **scan_options
+    ) -> DataDictionary:
+        '''
+        - asyncio counterpart of read_all, reading files on executor (or a 
+        thread pool of max_concurrency workers) so the event loop is not 
+        blocked
+        - at most max_concurrency files are read at once and cancelling the
+        coroutine cancels all reads that have not yet started
+        - scan_options are recursive, pattern, partitioning and 
+        partition_filters as in read_all, the directory scan also runs in a 
+        worker thread
+        '''
+        
+        tasks = await asyncio.to_thread(
+            _scan_files,
+            path, 
+            _format_options(formats, read_options), 
+            detect = True,
+            **scan_options
+        )
+        return await _aload_files(
+            tasks, messaging, max_concurrency, executor, cache
+        )
+    
+    @staticmethod     
+    def read_all_json(
+        path: str, 
+        lines: bool = False,
+        engine: str = None,
+        dtype_backend: str = None,
+        messaging: bool = True, 
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all json files from directory and assigns to dataframes
+        - lines reads line-delimited json
+        - engine = 'pyarrow' parses line-delimited json with arrow's 
+        multithreaded reader
+        - dtype_backend = 'pyarrow' returns arrow-backed dtypes
+        '''
+        
+        read_options = _drop_none({
+            'lines': lines or engine == 'pyarrow',
+            'engine': engine, 
+            'dtype_backend': dtype_backend
+        })
+        tasks = _scan_files(
+            path, {'json': read_options}, **_pop_scan_options(options)
+        )
+        return _load_files(tasks, messaging, **options)
 
     @staticmethod
     def read_all_csv(
         path: str, 
         seperator: str = ',', 
-        messaging: bool = True
-    ) -> dict:
-        '''loads all csv files from directory and assigns to dataframes'''
-        
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
-        else:
-            logger.debug('Please enter a valid path.')
+        engine: str = None,
+        dtype_backend: str = None,
+        infer_dtypes: int = None,
+        schema: dict = None,
+        sniff_bytes: int = 2 ** 14,
+        messaging: bool = True,
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all csv files from directory and assigns to dataframes
+        - seperator = 'auto' detects the delimiter, quoting, header row and 
+        encoding of each file from its first sniff_bytes bytes, cached per 
+        file path, size and modified time
+        - engine = 'pyarrow' parses with arrow's multithreaded csv reader
+        - dtype_backend = 'pyarrow' returns arrow-backed dtypes
+        - infer_dtypes samples that many rows of each file to choose compact 
+        dtypes (categories, parsed dates, downcast integers) which the full 
+        file is then read into
+        - schema sets {column: dtype} for every file, or per file as 
+        {name: {column: dtype}}, taking priority over inference
+        '''
         
-        for file in files:
-            if file.endswith('.csv'):
-                df = pd.read_csv(
-                    os.path.join(path, file), sep = f'{seperator}'
-                )
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
-            
-        return data_dictionary
+        sniff = seperator == 'auto'
+        read_options = _drop_none({
+            'sep': None if sniff else seperator, 
+            'engine': engine, 
+            'dtype_backend': dtype_backend
+        })
+        tasks = _scan_files(
+            path, {'csv': read_options}, **_pop_scan_options(options)
+        )
+        if sniff:
+            tasks = _set_sniffed_options(tasks, sniff_bytes)
+        per_file = schema is not None and any(
+            isinstance(dtypes, dict) for dtypes in schema.values()
+        )
+        if schema is not None and not per_file:
+            # a flat {column: dtype} schema applies to every file
+            schema = {task[0]: schema for task in tasks}
+        if infer_dtypes is not None or schema is not None:
+            tasks = _set_reader(tasks, _read_csv_compact)
+            tasks = _set_file_options(
+                tasks, {'sample_rows': infer_dtypes, 'schema': schema}
+            )
+        return _load_files(tasks, messaging, **options)
 
     @staticmethod
-    def read_all_xlsx(path: str, messaging: bool = True) -> dict:
-        '''loads all xlsx files from directory and assigns to dataframes'''
+    def read_all_xlsx(
+        path: str, 
+        sheets: Union[str, list] = None,
+        engine: str = None,
+        messaging: bool = True, 
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all xlsx files from directory and assigns to dataframes
+        - reads the first sheet of each workbook by default, or all sheets 
+        (sheets = 'all') or the named sheets in one pass, keyed 
+        'workbook.sheet'
+        - engine defaults to calamine if python-calamine is installed and 
+        openpyxl (in read-only mode) otherwise
+        '''
         
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
-        else:
-            logger.debug('Please enter a valid path.')
-            
-        for file in files:
-            if file.endswith('.xlsx'):
-                df = pd.read_excel(os.path.join(path, file))
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
-            
-        return data_dictionary
+        tasks = _scan_files(
+            path, 
+            {'xlsx': _drop_none({
+                'sheets': sheets, 'engine': engine or XLSX_ENGINE
+            })}, 
+            **_pop_scan_options(options)
+        )
+        return _load_files(tasks, messaging, **options)
 
     @staticmethod
-    def read_all_feather(path: str, messaging: bool = True) -> dict:
-        '''loads all feather files from directory and assigns to dataframes'''
+    def read_all_feather(
+        path: str, 
+        columns: Union[list, dict] = None,
+        filters: Union[list, dict] = None,
+        memory_map: bool = False,
+        as_arrow: bool = False,
+        messaging: bool = True, 
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all feather files from directory and assigns to dataframes
+        - columns and filters (pyarrow DNF, e.g. [('year', '=', 2024)]) are 
+        pushed down to pyarrow, a dict of {name: value} sets them per file, 
+        and filters on hive partition keys are applied to the directories
+        - memory_map maps files instead of reading them, files written with 
+        compression = 'uncompressed' are then zero-copy and share one page 
+        cache copy across processes
+        - as_arrow returns pyarrow tables, which stay zero-copy on top of the 
+        memory map (use the default thread executor to keep them shared)
+        '''
         
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
-        else:
-            logger.debug('Please enter a valid path.')
-            
-        for file in files:
-            if file.endswith('.feather'):
-                df = pd.read_feather(os.path.join(path, file))
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
-            
-        return data_dictionary
+        tasks = _scan_files(
+            path, 
+            {'feather': {'memory_map': memory_map, 'as_arrow': as_arrow}},
+            **_pop_scan_options(options, filters)
+        )
+        tasks = _set_file_options(
+            tasks, {'columns': columns, 'filters': filters}
+        )
+        return _load_files(tasks, messaging, **options)
 
     @staticmethod
-    def read_all_parquet(path: str, messaging: bool = True) -> dict:
-        '''loads all parquet files from directory and assigns to dataframes'''
+    def read_all_parquet(
+        path: str, 
+        columns: Union[list, dict] = None,
+        filters: Union[list, dict] = None,
+        messaging: bool = True, 
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all parquet files from directory and assigns to dataframes
+        - columns and filters (pyarrow DNF, e.g. [('year', '=', 2024)]) are 
+        pushed down to pyarrow so unneeded columns and row groups are skipped,
+        a dict of {name: value} sets them per file, and filters on hive 
+        partition keys are applied to the directories
+        '''
         
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
-        else:
-            logger.debug('Please enter a valid path.')
-            
-        for file in files:
-            if file.endswith('.parquet'):
-                df = pd.read_parquet(os.path.join(path, file))
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
-            
-        return data_dictionary
+        tasks = _scan_files(
+            path, {'parquet': None}, **_pop_scan_options(options, filters)
+        )
+        tasks = _set_file_options(
+            tasks, {'columns': columns, 'filters': filters}
+        )
+        return _load_files(tasks, messaging, **options)
 
     @staticmethod
-    def read_all_pickle(path: str, messaging: bool = True) -> dict:
+    def read_all_pickle(
+        path: str, 
+        messaging: bool = True, 
+        **options
+    ) -> DataDictionary:
         '''loads all pickle files from directory and assigns to dataframes'''
         
-        if dp.check_path_valid(path):
-            files = os.listdir(path)
-            data_dictionary = dict()
+        tasks = _scan_files(
+            path, {'pickle': None}, **_pop_scan_options(options)
+        )
+        return _load_files(tasks, messaging, **options)
+        
+    @staticmethod
+    def stream_csv(
+        path: str,
+        chunksize: int = 100_000,
+        seperator: str = ',',
+        messaging: bool = True
+    ):
+        '''
+        - yields (name, chunk) pairs for all csv files in directory, holding 
+        at most chunksize rows in memory at a time
+        - seperator = 'auto' sniffs each file as in read_all_csv
+        '''
+        
+        if seperator == 'auto':
+            tasks = _set_sniffed_options(
+                _scan_files(path, {'csv': {'chunksize': chunksize}})
+            )
         else:
-            logger.debug('Please enter a valid path.')
-            
-        for file in files:
-            if file.endswith('.pickle'):
-                df = pd.read_pickle(os.path.join(path, file))
-                filename = os.path.splitext(file)[0]
-                data_dictionary[f'{filename}'] = df
-                
-                if messaging:
-                    logger.debug(
-                        f'read {filename} ({len(filename):,} records)'
-                    )
-        if not data_dictionary:
-            logger.debug('No files read.')
-            
-        return data_dictionary
+            tasks = _scan_files(
+                path, {'csv': {'sep': seperator, 'chunksize': chunksize}}
+            )
+        yield from _stream_files(tasks, messaging)
+        
+    @staticmethod
+    def stream_json(
+        path: str,
+        chunksize: int = 100_000,
+        messaging: bool = True
+    ):
+        '''
+        yields (name, chunk) pairs for all line-delimited json files in 
+        directory, holding at most chunksize rows in memory at a time
+        '''
+        
+        tasks = _scan_files(
+            path, {'json': {'lines': True, 'chunksize': chunksize}}
+        )
+        yield from _stream_files(tasks, messaging)
         
     @staticmethod   
-    def read_all_sqlite(path: str, messaging: bool = True) -> dict:
-        '''loads all tables from sqlite database and assigns to dataframes'''
+    def read_all_sqlite(
+        path: str, 
+        tables: list = None,
+        columns: Union[list, dict] = None,
+        where: Union[str, dict] = None,
+        watermark: Union[str, dict] = None,
+        watermark_path: str = None,
+        mmap_size: int = 2 ** 28,
+        messaging: bool = True,
+        **options
+    ) -> DataDictionary:
+        '''
+        - loads all tables (or only tables) from sqlite database and assigns 
+        to dataframes
+        - each table is read on its own read-only connection, so tables load
+        concurrently with max_workers
+        - columns and where (an sql condition) restrict the query, a dict of 
+        {table: value} sets them per table
+        - watermark (a column or 'rowid', per table if a dict) only reads rows
+        above the value stored in watermark_path by the previous call, then 
+        stores the new maximum
+        - mmap_size sets how many bytes of the database sqlite memory-maps
+        '''
         
-        # TODO: find a less nested method for performing this function
+        if watermark is not None and options.get('lazy'):
+            raise ValueError('watermark cannot be used with lazy reads.')
+        if watermark is not None and options.get('combine'):
+            raise ValueError('watermark cannot be used with combined reads.')
+        if watermark is not None and (
+            options.get('nrows') is not None 
+            or options.get('sample_fraction') is not None
+        ):
+            raise ValueError('watermark cannot be used with sampled reads.')
+        tasks = _scan_sqlite(
+            path, 
+            {'mmap_size': mmap_size}, 
+            tables,
+            {'columns': columns, 'where': where, 'watermark': watermark},
+            watermark_path
+        )
+        data_dictionary = _load_files(tasks, messaging, **options)
         
-        try:
-            if dp.check_path_valid(path):
-                with sqlite3.connect(path) as conn:
-                    with conn.cursor() as cur:
-                        table_names = cur.execute('''
-                                SELECT name 
-                                FROM sqlite_master 
-                                WHERE type = 'table';
-                            ''').fetchall()
-                        
-                        data_dictionary = dict()
-                        for table_name in table_names:
-                            query = f"SELECT * FROM {table_name[0]}"
-                            data_dictionary[table_name[0]] = pd.read_sql_query(
-                                query, conn
-                            )
-                            if messaging:
-                                logger.debug(
-                                    f'read {table_name[0]} '
-                                    f'({len(data_dictionary[table_name[0]]):,}' 
-                                    'records)'
-                                )
-                                
-                        if not data_dictionary:
-                            logger.debug('No files read.')                            
-                        return data_dictionary 
-                    
-        except OperationalError:
-            logger.debug('WARNING: Failed to connect to database.')
\ No newline at end of file
+        watermarks = dict()
+        for table, _, _, read_options in tasks:
+            if table not in data_dictionary \
+                    or 'watermark' not in read_options:
+                continue
+            value = _pop_watermark(
+                data_dictionary[table], read_options.get('since')
+            )
+            if value is not None:
+                watermarks[table] = {
+                    'column': read_options['watermark'], 'value': value
+                }
+        if watermark_path is not None and watermarks:
+            _save_watermarks(watermark_path, path, watermarks)
+        return data_dictionary
+    
+    @staticmethod
+    def stream_sqlite(
+        path: str,
+        chunksize: int = 100_000,
+        tables: list = None,
+        columns: Union[list, dict] = None,
+        where: Union[str, dict] = None,
+        watermark: Union[str, dict] = None,
+        watermark_path: str = None,
+        mmap_size: int = 2 ** 28,
+        messaging: bool = True
+    ):
+        '''
+        - yields (name, chunk) pairs for all tables (or only tables) in sqlite
+        database, holding at most chunksize rows in memory at a time
+        - columns, where and watermark behave as in read_all_sqlite, 
+        watermarks are stored once the stream is exhausted
+        '''
+        
+        tasks = _scan_sqlite(
+            path, 
+            {'chunksize': chunksize, 'mmap_size': mmap_size},
+            tables,
+            {'columns': columns, 'where': where, 'watermark': watermark},
+            watermark_path
+        )
+        task_options = {task[0]: task[3] for task in tasks}
+        watermarks = dict()
+        for table, chunk in _stream_files(tasks, messaging):
+            read_options = task_options[table]
+            if 'watermark' in read_options:
+                if table in watermarks:
+                    current = watermarks[table]['value']
+                else:
+                    current = read_options.get('since')
+                value = _pop_watermark(chunk, current)
+                if value is not None:
+                    watermarks[table] = {
+                        'column': read_options['watermark'], 'value': value
+                    }
+            yield table, chunk
+        if watermark_path is not None and watermarks:
+            _save_watermarks(watermark_path, path, watermarks)
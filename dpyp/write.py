@@ -5,128 +5,830 @@ from data pipelines
 
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import sqlite3
 import os
+import asyncio
 import logging
+from abc import ABC, abstractmethod
+from functools import partial
+from contextlib import closing, ExitStack
+from typing import Union
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from .read import _quote_identifier
 
 
 logger = logging.getLogger(__name__)
 
 
+def _write_parquet(
+    data: pd.DataFrame, 
+    file_path: str,
+    partition_cols: list = None,
+    row_group_size: int = None,
+    compression: str = 'snappy',
+    use_dictionary: Union[bool, list] = True
+) -> int:
+    '''
+    - writes data as parquet with column statistics, returning bytes written
+    - partition_cols writes a hive-partitioned dataset to the file_path 
+    directory, replacing only the partitions present in data
+    '''
+    
+    table = pa.Table.from_pandas(data)
+    write_options = {
+        'row_group_size': row_group_size,
+        'compression': compression,
+        'use_dictionary': use_dictionary,
+        'write_statistics': True
+    }
+    if not partition_cols:
+        pq.write_table(table, file_path, **write_options)
+        return os.path.getsize(file_path)
+    written = list()
+    pq.write_to_dataset(
+        table,
+        file_path,
+        partition_cols = partition_cols,
+        basename_template = 'part-{i}.parquet',
+        existing_data_behavior = 'delete_matching',
+        file_visitor = lambda written_file: written.append(written_file.size),
+        **write_options
+    )
+    return sum(written)
+
+
+# file extension and writer for each format written from dictionaries
+WRITERS = {
+    'json': ('.json', pd.DataFrame.to_json),
+    'csv': ('.csv', pd.DataFrame.to_csv),
+    'xlsx': ('.xlsx', pd.DataFrame.to_excel),
+    'feather': ('.feather', pd.DataFrame.to_feather),
+    'parquet': ('.parquet', _write_parquet),
+    'pickle': ('.pickle', pd.DataFrame.to_pickle)
+}
+
+# pyarrow-backed writers release the GIL so are scheduled on threads, all
+# other writers are scheduled on processes by default
+THREAD_WRITERS = (pd.DataFrame.to_feather, _write_parquet)
+
+# values accepted for the sqlite journal_mode and synchronous pragmas
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class WriteResult(dict):
+    '''
+    - dictionary of {name: bytes written} returned by WriteData, failed 
+    writes are recorded in 'errors' as {name: exception} rather than 
+    aborting the batch
+    - 'bytes_written' holds the total bytes written across all files
+    '''
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.errors = dict()
+        
+    @property
+    def bytes_written(self) -> int:
+        return sum(self.values())
+
+
+def _write_tasks(
+    input_dict: dict, 
+    path: str, 
+    output_prefix: str, 
+    file_format: str,
+    write_options: dict = None
+) -> list:
+    '''
+    returns (name, data, file_path, writer, write_options) write tasks for 
+    all dataframes beginning 'df_' in input_dict, renamed with output_prefix
+    '''
+    
+    extension, writer = WRITERS[file_format]
+    write_options = write_options or dict()
+    if write_options.get('partition_cols'):
+        # partitioned datasets are written as directories
+        extension = ''
+    tasks = list()
+    for name, data in input_dict.items():
+        if name.startswith('df_') & isinstance(data, pd.DataFrame):
+            output_name = f'{output_prefix}_{name[3:]}'
+            file_path = os.path.join(path, f'{output_name}{extension}')
+            tasks.append((output_name, data, file_path, writer, write_options))
+    return tasks
+
+
+def _write_frame(
+    data: pd.DataFrame, 
+    file_path: str, 
+    writer, 
+    write_options: dict
+) -> int:
+    '''writes data to file_path with writer, returning the bytes written'''
+    
+    written = writer(data, file_path, **write_options)
+    return os.path.getsize(file_path) if written is None else written
+
+
+def _write_pool(
+    tasks: list, 
+    max_workers: int, 
+    executor: Union[str, Executor], 
+    stack: ExitStack
+) -> Executor:
+    '''
+    returns the executor to write tasks on, or None to write serially, any 
+    pool created is shut down when stack exits
+    '''
+    
+    if max_workers is None and executor is None:
+        return None
+    if isinstance(executor, Executor):
+        return executor
+    if executor is None:
+        thread_safe = all(task[3] in THREAD_WRITERS for task in tasks)
+        executor = 'thread' if thread_safe else 'process'
+    if executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers = max_workers)
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(max_workers = max_workers)
+    else:
+        raise ValueError(
+            "executor must be 'thread', 'process' or an Executor."
+        )
+    return stack.enter_context(pool)
+
+
+def _write_frames(
+    tasks: list, 
+    messaging: bool = True, 
+    max_workers: int = None, 
+    executor: Union[str, Executor] = None
+) -> WriteResult:
+    '''
+    - writes tasks serially, or concurrently on executor (thread, process or
+    an Executor) if max_workers or executor are set
+    - by default pyarrow writers run on threads and all others on processes
+    - a failed write is logged and recorded in the result's errors
+    '''
+    
+    result = WriteResult()
+    with ExitStack() as stack:
+        pool = _write_pool(tasks, max_workers, executor, stack)
+        if pool is None:
+            outcomes = (partial(_write_frame, *task[1:]) for task in tasks)
+        else:
+            futures = [pool.submit(_write_frame, *task[1:]) for task in tasks]
+            outcomes = (future.result for future in futures)
+        for (name, data, *_), outcome in zip(tasks, outcomes):
+            try:
+                result[name] = outcome()
+            except Exception as e:
+                logger.debug(f'WARNING: failed to write {name} ({e})')
+                result.errors[name] = e
+                continue
+            if messaging:
+                logger.debug(f'wrote {name} ({len(data):,} records)')
+    if messaging and result:
+        logger.debug(
+            f'wrote {len(result)} files '
+            f'({result.bytes_written / 1e6:,.1f} MB)'
+        )
+    return result
+
+
+def _set_pragmas(
+    conn: sqlite3.Connection, 
+    journal_mode: str = None, 
+    synchronous: str = None
+) -> None:
+    '''
+    - sets the journal_mode and synchronous pragmas of conn if given
+    - journal_mode persists in the database file while synchronous only 
+    applies to conn
+    '''
+    
+    if journal_mode is not None:
+        if journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f'journal_mode must be one of {JOURNAL_MODES}')
+        conn.execute(f'PRAGMA journal_mode = {journal_mode.upper()}')
+    if synchronous is not None:
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(
+                f'synchronous must be one of {SYNCHRONOUS_MODES}'
+            )
+        conn.execute(f'PRAGMA synchronous = {synchronous.upper()}')
+
+
+def _sqlite_rows(data: pd.DataFrame, chunksize: int):
+    '''
+    - yields lists of at most chunksize row tuples of python values, with 
+    nulls as None, to insert with executemany
+    - values are converted as to_sql converts them: datetimes are written 
+    as text one value at a time (keeping any utc offset, with microseconds 
+    only when non-zero) and timedeltas as integers in the column's unit
+    '''
+    
+    for start in range(0, len(data), chunksize):
+        chunk = data.iloc[start:start + chunksize]
+        columns = list()
+        for _, col in chunk.items():
+            if pd.api.types.is_datetime64_any_dtype(col):
+                col = col.map(
+                    lambda value: value.to_pydatetime().isoformat(' '), 
+                    na_action = 'ignore'
+                )
+            elif pd.api.types.is_timedelta64_dtype(col):
+                col = pd.Series(
+                    col.to_numpy().view('int64'), 
+                    index = col.index, 
+                    dtype = object
+                ).where(col.notna(), None)
+            if col.hasnans:
+                col = col.astype(object).where(col.notna(), None)
+            columns.append(col.tolist())
+        yield list(zip(*columns))
+
+
+def _create_indexes(
+    conn: sqlite3.Connection, 
+    name: str, 
+    index_columns: list
+) -> None:
+    '''creates an index on table name per column (or list of columns)'''
+    
+    for columns in index_columns:
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        index = _quote_identifier(f'ix_{name}_{"_".join(columns)}')
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS {index} ON {_quote_identifier(name)} '
+            f'({", ".join(_quote_identifier(col) for col in columns)})'
+        )
+
+
+def _upsert_statement(table: str, columns: list, keys: list) -> str:
+    '''
+    returns an insert into table that updates rows whose keys already exist,
+    only where at least one column has changed
+    '''
+    
+    quoted = [_quote_identifier(col) for col in columns]
+    values = [col for col in quoted if col not in keys]
+    statement = (
+        f'INSERT INTO {table} ({", ".join(quoted)}) '
+        f'VALUES ({", ".join("?" * len(quoted))}) '
+        f'ON CONFLICT ({", ".join(keys)}) DO '
+    )
+    if not values:
+        return statement + 'NOTHING'
+    updates = ', '.join(f'{col} = excluded.{col}' for col in values)
+    changed = ' OR '.join(f'{col} IS NOT excluded.{col}' for col in values)
+    return statement + f'UPDATE SET {updates} WHERE {changed}'
+
+
+def _key_frame(data: pd.DataFrame, keys: list) -> pd.DataFrame:
+    '''
+    - returns data with any keys naming index levels moved into columns
+    - raises ValueError for keys that are neither columns nor index levels,
+    and for null keys, which a unique index treats as distinct so they 
+    would be inserted again on every upsert
+    '''
+    
+    index_keys = [
+        key for key in keys 
+        if key not in data.columns and key in data.index.names
+    ]
+    if index_keys:
+        data = data.reset_index(level = index_keys)
+    missing = [key for key in keys if key not in data.columns]
+    if missing:
+        raise ValueError(f'Key columns {missing} not found in data.')
+    null_keys = [key for key in keys if data[key].isna().any()]
+    if null_keys:
+        raise ValueError(f'Key columns {null_keys} contain null values.')
+    return data
+
+
+def _prepare_table(
+    conn: sqlite3.Connection, 
+    name: str, 
+    data: pd.DataFrame, 
+    keys: list = None
+) -> str:
+    '''
+    creates table name with the columns of data if it does not exist, with a 
+    unique index on keys (checked by _key_frame) if given, and returns the 
+    statement inserting (or upserting on keys) rows of data into it
+    '''
+    
+    table = _quote_identifier(name)
+    conn.execute(
+        pd.io.sql.get_schema(data, name, con = conn).replace(
+            'CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1
+        )
+    )
+    if keys is None:
+        columns = ', '.join(_quote_identifier(col) for col in data.columns)
+        return (
+            f'INSERT INTO {table} ({columns}) '
+            f'VALUES ({", ".join("?" * len(data.columns))})'
+        )
+    unique_index = _quote_identifier(f'ux_{name}_{"_".join(keys)}')
+    quoted_keys = [_quote_identifier(col) for col in keys]
+    conn.execute(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS {unique_index} '
+        f'ON {table} ({", ".join(quoted_keys)})'
+    )
+    return _upsert_statement(table, data.columns, quoted_keys)
+
+
+def _write_sqlite_bulk(
+    conn: sqlite3.Connection,
+    input_dict: dict,
+    overwrite: bool = False,
+    chunksize: int = 50_000,
+    indexes: dict = None,
+    key_columns: Union[list, dict] = None,
+    messaging: bool = True
+) -> None:
+    '''
+    - writes all dataframes in input_dict to conn in a single transaction, 
+    inserting chunks of rows with executemany
+    - tables match to_sql, existing non-unique indexes are dropped for the 
+    load and recreated with the index column and indexes ({table: [columns]})
+    after
+    - tables with key_columns (a list, or {table: [columns]}) are upserted 
+    against a unique index on those columns instead, without the dataframe 
+    index, updating only rows whose values have changed
+    - rolls back every table if any write fails
+    '''
+    
+    indexes = indexes or dict()
+    conn.execute('BEGIN')
+    try:
+        for name, data in input_dict.items():
+            if not isinstance(data, pd.DataFrame):
+                continue
+            keys = key_columns.get(name) if isinstance(key_columns, dict) \
+                else key_columns
+            if keys is None:
+                index_names = [
+                    col if col is not None else 'index' 
+                    for col in data.index.names
+                ]
+                data = data.reset_index()
+            else:
+                keys = [keys] if isinstance(keys, str) else list(keys)
+                data = _key_frame(data, keys)
+                index_names = list()
+            if overwrite:
+                conn.execute(f'DROP TABLE IF EXISTS {_quote_identifier(name)}')
+            insert = _prepare_table(conn, name, data, keys)
+            
+            # indexes are rebuilt once after the load rather than per row, 
+            # unique indexes are kept as they enforce constraints and upserts
+            deferred = conn.execute('''
+                SELECT name, sql 
+                FROM sqlite_master 
+                WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+                    AND UPPER(sql) NOT LIKE 'CREATE UNIQUE%';
+            ''', (name,)).fetchall()
+            for index, _ in deferred:
+                conn.execute(f'DROP INDEX {_quote_identifier(index)}')
+                
+            changes = conn.total_changes
+            for rows in _sqlite_rows(data, chunksize):
+                conn.executemany(insert, rows)
+            changes = conn.total_changes - changes
+                
+            for _, index_sql in deferred:
+                conn.execute(index_sql)
+            index_columns = [index_names] if index_names else list()
+            _create_indexes(
+                conn, name, [*index_columns, *indexes.get(name, [])]
+            )
+            if messaging and keys is not None:
+                logger.debug(
+                    f'upserted {name} ({changes:,} of {len(data):,} records '
+                    'new or changed)'
+                )
+            elif messaging:
+                logger.debug(f'wrote {name} ({len(data):,} records)')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+class StreamWriter(ABC):
+    '''
+    - base class for writers appending dataframe chunks to a single output, 
+    so chunked read, clean and write pipelines run in constant memory
+    - the columns of the first chunk fix the schema, later chunks are 
+    reordered (and for arrow writers cast) to match it
+    - used as a context manager, or closed with close(), write_all consumes
+    a generator of chunks and returns the total rows written
+    '''
+    
+    def __init__(self, path: str, messaging: bool = True):
+        self.path = path
+        self.messaging = messaging
+        self.rows = 0
+        self.columns = None
+        self.closed = False
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+            
+    def write(self, chunk: pd.DataFrame) -> None:
+        '''appends chunk to the output'''
+        
+        if self.closed:
+            raise ValueError('Cannot write to a closed writer.')
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        self._write(chunk[self.columns])
+        self.rows += len(chunk)
+        
+    def write_all(self, chunks) -> int:
+        '''appends every chunk from an iterable of chunks'''
+        
+        for chunk in chunks:
+            self.write(chunk)
+        return self.rows
+    
+    def close(self) -> None:
+        '''finalises the output, further writes raise ValueError'''
+        
+        if self.closed:
+            return
+        self._close()
+        self.closed = True
+        if self.messaging:
+            logger.debug(f'wrote {self.path} ({self.rows:,} records)')
+            
+    def _abort(self) -> None:
+        self.close()
+        
+    @abstractmethod
+    def _write(self, chunk: pd.DataFrame) -> None:
+        '''appends chunk, already in the column order of the first chunk'''
+    
+    @abstractmethod
+    def _close(self) -> None:
+        '''finalises and closes the output'''
+
+
+class CsvStreamWriter(StreamWriter):
+    '''appends chunks to a csv file, writing the header once'''
+    
+    def __init__(
+        self, 
+        path: str, 
+        seperator: str = ',', 
+        index: bool = False,
+        messaging: bool = True
+    ):
+        super().__init__(path, messaging)
+        self.seperator = seperator
+        self.index = index
+        self._file = open(path, 'w', newline = '', encoding = 'utf-8')
+        
+    def _write(self, chunk: pd.DataFrame) -> None:
+        chunk.to_csv(
+            self._file, 
+            sep = self.seperator, 
+            index = self.index, 
+            header = self._file.tell() == 0
+        )
+        
+    def _close(self) -> None:
+        self._file.close()
+
+
+class _ArrowStreamWriter(StreamWriter):
+    '''
+    base class for pyarrow writers, converting chunks to tables with schema 
+    (a pyarrow schema, by default that of the first chunk)
+    '''
+    
+    def __init__(
+        self, 
+        path: str, 
+        schema: pa.Schema = None, 
+        messaging: bool = True
+    ):
+        super().__init__(path, messaging)
+        self.schema = schema
+        self._writer = None
+        
+    def _write(self, chunk: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(
+            chunk, schema = self.schema, preserve_index = False
+        )
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = self._open(self.schema)
+        self._write_table(table)
+        
+    def _write_table(self, table: pa.Table) -> None:
+        self._writer.write_table(table)
+        
+    def _close(self) -> None:
+        if self._writer is None and self.schema is not None:
+            # writes an empty file if no chunks were written
+            self._writer = self._open(self.schema)
+        if self._writer is not None:
+            self._writer.close()
+            
+    @abstractmethod
+    def _open(self, schema: pa.Schema):
+        '''returns a pyarrow writer for the output with schema'''
+
+
+class ParquetStreamWriter(_ArrowStreamWriter):
+    '''
+    - appends chunks to a parquet file with pq.ParquetWriter, each chunk 
+    becoming at least one row group (split at row_group_size rows)
+    - compression and use_dictionary are as in write_dict_to_parquet
+    '''
+    
+    def __init__(
+        self, 
+        path: str, 
+        schema: pa.Schema = None, 
+        row_group_size: int = None,
+        compression: str = 'snappy',
+        use_dictionary: Union[bool, list] = True,
+        messaging: bool = True
+    ):
+        super().__init__(path, schema, messaging)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.use_dictionary = use_dictionary
+        
+    def _open(self, schema: pa.Schema) -> pq.ParquetWriter:
+        return pq.ParquetWriter(
+            self.path, 
+            schema, 
+            compression = self.compression, 
+            use_dictionary = self.use_dictionary,
+            write_statistics = True
+        )
+    
+    def _write_table(self, table: pa.Table) -> None:
+        self._writer.write_table(table, row_group_size = self.row_group_size)
+
+
+class FeatherStreamWriter(_ArrowStreamWriter):
+    '''
+    - appends chunks to an arrow ipc file readable as feather, or to an ipc
+    stream if stream is set
+    - compression may be 'lz4' or 'zstd'
+    '''
+    
+    def __init__(
+        self, 
+        path: str, 
+        schema: pa.Schema = None, 
+        stream: bool = False,
+        compression: str = None,
+        messaging: bool = True
+    ):
+        super().__init__(path, schema, messaging)
+        self.stream = stream
+        self.compression = compression
+        
+    def _open(self, schema: pa.Schema):
+        options = pa.ipc.IpcWriteOptions(compression = self.compression)
+        new_writer = pa.ipc.new_stream if self.stream else pa.ipc.new_file
+        return new_writer(self.path, schema, options = options)
+
+
+class SqliteStreamWriter(StreamWriter):
+    '''
+    - appends chunks to table in a sqlite database within one transaction, 
+    committed on close and rolled back if the writing context fails
+    - the table is created from the first chunk if it does not exist, 
+    chunk indexes are not written unless they are key_columns
+    - key_columns upserts chunks as in write_dict_to_sqlite, journal_mode 
+    and synchronous set the sqlite pragmas
+    '''
+    
+    def __init__(
+        self, 
+        path: str, 
+        table: str,
+        overwrite: bool = False,
+        chunksize: int = 50_000,
+        key_columns: list = None,
+        journal_mode: str = None,
+        synchronous: str = None,
+        messaging: bool = True
+    ):
+        super().__init__(path, messaging)
+        self.table = table
+        self.chunksize = chunksize
+        self.key_columns = [key_columns] if isinstance(key_columns, str) \
+            else key_columns
+        self._insert = None
+        self._conn = sqlite3.connect(path)
+        try:
+            _set_pragmas(self._conn, journal_mode, synchronous)
+            self._conn.execute('BEGIN')
+            if overwrite:
+                self._conn.execute(
+                    f'DROP TABLE IF EXISTS {_quote_identifier(table)}'
+                )
+        except Exception:
+            self._conn.close()
+            raise
+        
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.key_columns is not None:
+            chunk = _key_frame(chunk, self.key_columns)
+        super().write(chunk)
+        
+    def _write(self, chunk: pd.DataFrame) -> None:
+        if self._insert is None:
+            self._insert = _prepare_table(
+                self._conn, self.table, chunk, self.key_columns
+            )
+        for rows in _sqlite_rows(chunk, self.chunksize):
+            self._conn.executemany(self._insert, rows)
+            
+    def _close(self) -> None:
+        try:
+            self._conn.commit()
+        finally:
+            self._conn.close()
+        
+    def _abort(self) -> None:
+        self._conn.rollback()
+        self._conn.close()
+        self.closed = True
+
+
+# streaming writer for each format written from chunks
+STREAM_WRITERS = {
+    'csv': CsvStreamWriter,
+    'feather': FeatherStreamWriter,
+    'parquet': ParquetStreamWriter,
+    'sqlite': SqliteStreamWriter
+}
+
+
 class WriteData:
-    '''contains functionality for writing data to various file formats'''
+    '''
+    - contains functionality for writing data to various file formats
+    - write_dict_to_* file methods accept max_workers and executor to write 
+    frames concurrently and return a WriteResult of bytes written per file
+    - write_stream writes chunk generators in constant memory with the 
+    StreamWriter classes
+    '''
      
     @staticmethod       
     def write_dict_to_json(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
+    ) -> WriteResult:
         '''writes all dataframes in dict as json with modifiable prefix'''
 
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_json(f'{path}/{output_prefix}_{name[3:]}.json')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
+        return _write_frames(
+            _write_tasks(input_dict, path, output_prefix, 'json'),
+            messaging,
+            max_workers,
+            executor
+        )
 
     @staticmethod       
     def write_dict_to_csv(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
+    ) -> WriteResult:
         '''writes all dataframes in dict as csv with modifiable prefix'''
-        
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_csv(f'{path}/{output_prefix}_{name[3:]}.csv')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
-        
+
+        return _write_frames(
+            _write_tasks(input_dict, path, output_prefix, 'csv'),
+            messaging,
+            max_workers,
+            executor
+        )
+
     @staticmethod       
     def write_dict_to_xlsx(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
+    ) -> WriteResult:
         '''writes all dataframes in dict as xlsx with modifiable prefix'''
-        
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_excel(f'{path}/{output_prefix}_{name[3:]}.xlsx')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
+
+        return _write_frames(
+            _write_tasks(input_dict, path, output_prefix, 'xlsx'),
+            messaging,
+            max_workers,
+            executor
+        )
 
     @staticmethod       
     def write_dict_to_feather(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
+    ) -> WriteResult:
         '''writes all dataframes in dict as feather with modifiable prefix'''
-        
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_feather(f'{path}/{output_prefix}_{name[3:]}.feather')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
-    
+
+        return _write_frames(
+            _write_tasks(input_dict, path, output_prefix, 'feather'),
+            messaging,
+            max_workers,
+            executor
+        )
+
     @staticmethod       
     def write_dict_to_parquet(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        partition_cols: list = None,
+        row_group_size: int = None,
+        compression: str = 'snappy',
+        use_dictionary: Union[bool, list] = True,
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
-        '''writes all dataframes in dict as parquet with modifiable prefix'''
-        
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_parquet(f'{path}/{output_prefix}_{name[3:]}.parquet')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
+    ) -> WriteResult:
+        '''
+        - writes all dataframes in dict as parquet with modifiable prefix
+        - files are written with min/max column statistics so readers can 
+        skip row groups, row_group_size (rows), compression (e.g. 'zstd') and
+        use_dictionary (bool or list of columns) tune the layout
+        - partition_cols writes each dataframe as a hive-partitioned dataset 
+        directory (e.g. 'df_a/year=2024/part-0.parquet'), replacing only the 
+        partitions present in the dataframe
+        '''
+
+        write_options = {
+            'partition_cols': partition_cols,
+            'row_group_size': row_group_size,
+            'compression': compression,
+            'use_dictionary': use_dictionary
+        }
+        return _write_frames(
+            _write_tasks(
+                input_dict, path, output_prefix, 'parquet', write_options
+            ),
+            messaging,
+            max_workers,
+            executor
+        )
             
     @staticmethod       
     def write_dict_to_pickle(
         input_dict: dict, 
         path: str, 
         output_prefix: str = 'df',
+        max_workers: int = None,
+        executor: Union[str, Executor] = None,
         messaging: bool = True
-    ) -> None:
+    ) -> WriteResult:
         '''
         - writes all objects beginning with 'df_' in input_dict to path as 
         pickle
         - prefix allows user to rename processed files upon writing
         '''
-        
-        for name, data in input_dict.items():
-            if name.startswith('df_') & isinstance(data, pd.DataFrame):
-                data.to_pickle(f'{path}/{output_prefix}_{name[3:]}.pickle')
-                if messaging:
-                    logger.debug(
-                        f'wrote {output_prefix}_{name[3:]}'
-                        f'({len(data):,} records)'
-                    )
+
+        return _write_frames(
+            _write_tasks(input_dict, path, output_prefix, 'pickle'),
+            messaging,
+            max_workers,
+            executor
+        )
 
     # TODO: analyse to different methods and compare
     # @staticmethod                
@@ -190,14 +892,42 @@ class WriteData:
         input_dict: dict,
         path: str, 
         overwrite: bool = False, 
+        bulk: bool = False,
+        chunksize: int = 50_000,
+        journal_mode: str = None,
+        synchronous: str = None,
+        indexes: dict = None,
+        key_columns: Union[list, dict] = None,
         messaging: bool = True
     ) -> None:
         '''
         - overwrites table if set
         - creates database if path does not exist
         - appends to tables by default
+        - bulk writes all tables in one transaction with executemany in 
+        chunks of chunksize rows, deferring index creation until after the 
+        load, overwrite drops only the tables being written and any failure 
+        rolls back every table and is raised
+        - journal_mode (e.g. 'WAL') and synchronous (e.g. 'OFF') set the 
+        sqlite pragmas for the load, synchronous = 'OFF' trades durability
+        on power loss for speed
+        - indexes ({table: [columns]}) are created once tables are written
+        - key_columns (a list, or {table: [columns]}) upserts tables in bulk 
+        on a unique index of those columns, inserting new rows and updating
+        only changed rows, the dataframe index is only written if it is one 
+        of the key columns
         '''
         
+        if bulk or key_columns is not None:
+            # the database is kept so a failed load can be rolled back
+            with closing(sqlite3.connect(path)) as conn:
+                _set_pragmas(conn, journal_mode, synchronous)
+                _write_sqlite_bulk(
+                    conn, input_dict, overwrite, chunksize, indexes, 
+                    key_columns, messaging
+                )
+            return
+        
         # deletes old table
         if overwrite and os.path.exists(path):
             try:
@@ -206,17 +936,97 @@ class WriteData:
                 logger.debug('WARNING: File is being used by another process!')
                 
         # writes new table
-        with sqlite3.connect(path) as conn:
-            try:           
+        with closing(sqlite3.connect(path)) as conn:
+            try:
+                _set_pragmas(conn, journal_mode, synchronous)
                 for name, data in input_dict.items():
                     if isinstance(data, pd.DataFrame):
                         if overwrite:
                             data.to_sql(name, conn, if_exists = 'replace')
                         else:
                             data.to_sql(name, conn, if_exists = 'append')
+                        _create_indexes(
+                            conn, name, (indexes or dict()).get(name, [])
+                        )
+                        conn.commit()
                         if messaging:
                             logger.debug(
                                 f'wrote {name} ({len(data):,} records)'
                             )
             except Exception as e:
-                logger.debug(f'WARNING: {str(e)}')
\ No newline at end of file
+                logger.debug(f'WARNING: {str(e)}')
+
+    @staticmethod
+    def write_stream(
+        chunks, 
+        path: str, 
+        file_format: str = 'parquet', 
+        **kwargs
+    ) -> int:
+        '''
+        - writes an iterable of dataframe chunks (e.g. from ReadData.stream_*)
+        to a single file in constant memory, returning the rows written
+        - kwargs are passed to the format's StreamWriter, sqlite requires the
+        table name
+        - nothing is committed to sqlite if a chunk fails, other formats keep
+        the chunks written before the failure
+        '''
+        
+        writer = STREAM_WRITERS.get(file_format)
+        if writer is None:
+            raise ValueError(f'Unsupported format: {file_format}')
+        with writer(path, **kwargs) as stream_writer:
+            return stream_writer.write_all(chunks)
+
+    @staticmethod
+    async def awrite_dict(
+        input_dict: dict,
+        path: str,
+        file_format: str = 'parquet',
+        max_concurrency: int = 4,
+        executor: Executor = None,
+        **kwargs
+    ) -> WriteResult:
+        '''
+        - asyncio counterpart of the write_dict_to_* methods, writing frames 
+        on executor (or a thread pool of max_concurrency workers) so the 
+        event loop is not blocked
+        - at most max_concurrency frames are written at once and cancelling 
+        the coroutine cancels all writes that have not yet started
+        - kwargs are passed to write_dict_to_{file_format}, sqlite writes the 
+        whole dict in one call as a database accepts a single writer
+        - file writes return a WriteResult merged across all frames
+        '''
+        
+        write = getattr(WriteData, f'write_dict_to_{file_format}', None)
+        if write is None:
+            raise ValueError(f'Unsupported format: {file_format}')
+        if file_format == 'sqlite':
+            batches = [input_dict]
+        else:
+            batches = [{name: data} for name, data in input_dict.items()]
+            
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        pool = executor or ThreadPoolExecutor(max_workers = max_concurrency)
+        
+        async def write_batch(batch: dict):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    pool, partial(write, batch, path, **kwargs)
+                )
+                
+        try:
+            batch_results = await asyncio.gather(
+                *(write_batch(batch) for batch in batches)
+            )
+        finally:
+            if executor is None:
+                pool.shutdown(wait = False, cancel_futures = True)
+                
+        result = WriteResult()
+        for batch_result in batch_results:
+            if isinstance(batch_result, WriteResult):
+                result.update(batch_result)
+                result.errors.update(batch_result.errors)
+        return result
@@ -4,6 +4,7 @@
 import pytest
 import pandas as pd
 import dpyp as dp
+import os
 
     
 @pytest.fixture
@@ -449,4 +450,1036 @@ def test_unpack_data_dictionary_to_dict(df_sample):
     
 
 # read_all_sqlite #############################################################
-# def test_read_all_sqlite(df_sample):
\ No newline at end of file
+# def test_read_all_sqlite(df_sample):
+
+# ReadData concurrent loading #################################################
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_read_data_concurrent_matches_serial(tmp_path, df_sample, executor):
+    '''
+    tests that concurrent reads return the same frames as serial reads in a
+    deterministic key order
+    '''
+    
+    for i in [3, 1, 2]:
+        df_sample.to_csv(tmp_path/f'test_{i}.csv', index = False)
+    serial = dp.ReadData.read_all_csv(tmp_path)
+    concurrent = dp.ReadData.read_all_csv(
+        tmp_path, max_workers = 2, executor = executor
+    )
+    assert list(concurrent) == ['test_1', 'test_2', 'test_3']
+    assert list(concurrent) == list(serial)
+    assert all(concurrent[key].equals(serial[key]) for key in serial)
+    
+    
+def test_read_data_concurrent_captures_errors(tmp_path, df_sample):
+    '''
+    tests that a corrupt file is recorded in errors without aborting the 
+    remaining reads
+    '''
+    
+    df_sample.to_parquet(tmp_path/'good.parquet')
+    (tmp_path/'bad.parquet').write_bytes(b'not a parquet file')
+    data_dictionary = dp.ReadData.read_all_parquet(tmp_path, max_workers = 2)
+    assert data_dictionary['good'].equals(df_sample)
+    assert 'bad' not in data_dictionary
+    assert 'bad' in data_dictionary.errors
+
+
+# read_all ####################################################################
+def test_read_all_reads_mixed_directory(tmp_path, df_sample):
+    '''
+    tests that read_all reads every supported format in one call and ignores
+    unsupported files
+    '''
+    
+    df_sample.to_csv(tmp_path/'test_csv.csv', index = False)
+    df_sample.to_parquet(tmp_path/'test_parquet.parquet')
+    df_sample.to_pickle(tmp_path/'test_pickle.pickle')
+    df_sample.to_csv(tmp_path/'test_4.txt')
+    data_dictionary = dp.ReadData.read_all(tmp_path)
+    assert list(data_dictionary) == [
+        'test_csv', 'test_parquet', 'test_pickle'
+    ]
+    assert data_dictionary['test_parquet'].equals(df_sample)
+    assert data_dictionary['test_pickle'].equals(df_sample)
+    assert len(data_dictionary['test_csv']) == len(df_sample)
+    
+    
+def test_read_all_detects_extensionless_files(tmp_path, df_sample):
+    '''tests that files without extensions are identified by magic bytes'''
+    
+    df_sample.to_parquet(tmp_path/'test_parquet')
+    df_sample.to_feather(tmp_path/'test_feather')
+    df_sample.to_pickle(tmp_path/'test_pickle')
+    data_dictionary = dp.ReadData.read_all(
+        tmp_path, formats = ['parquet', 'feather']
+    )
+    assert list(data_dictionary) == ['test_feather', 'test_parquet']
+    assert data_dictionary['test_feather'].equals(df_sample)
+    
+    
+def test_read_all_keeps_extension_for_shared_names(tmp_path, df_sample):
+    '''tests that files sharing a name are keyed by their full filename'''
+    
+    df_sample.to_csv(tmp_path/'test.csv', index = False)
+    df_sample.to_parquet(tmp_path/'test.parquet')
+    data_dictionary = dp.ReadData.read_all(tmp_path)
+    assert list(data_dictionary) == ['test.csv', 'test.parquet']
+
+
+# stream_csv / stream_json ####################################################
+def test_stream_csv_yields_bounded_chunks(tmp_path, df_sample):
+    '''tests that stream_csv yields every row in chunks of chunksize'''
+    
+    df_sample.to_csv(tmp_path/'test_1.csv', index = False)
+    df_sample.to_csv(tmp_path/'test_2.csv', index = False)
+    chunks = list(dp.ReadData.stream_csv(tmp_path, chunksize = 4))
+    assert [name for name, _ in chunks] == [
+        'test_1', 'test_1', 'test_2', 'test_2'
+    ]
+    assert all(len(chunk) <= 4 for _, chunk in chunks)
+    assert sum(len(chunk) for _, chunk in chunks) == 2 * len(df_sample)
+    
+    
+def test_stream_json_reads_line_delimited_files(tmp_path, df_sample):
+    '''tests that stream_json reads line-delimited json in chunks'''
+    
+    df_sample.to_json(tmp_path/'test.json', orient = 'records', lines = True)
+    chunks = list(dp.ReadData.stream_json(tmp_path, chunksize = 5))
+    assert [len(chunk) for _, chunk in chunks] == [5, 1]
+    streamed = pd.concat([chunk for _, chunk in chunks], ignore_index = True)
+    assert streamed['Student Number'].equals(df_sample['Student Number'])
+
+
+# lazy loading ################################################################
+def test_read_data_lazy_reads_on_first_access(tmp_path, df_sample):
+    '''
+    tests that lazy data dictionaries list keys immediately but only read 
+    files when accessed
+    '''
+    
+    df_sample.to_parquet(tmp_path/'test_1.parquet')
+    df_sample.to_parquet(tmp_path/'test_2.parquet')
+    data_dictionary = dp.ReadData.read_all_parquet(tmp_path, lazy = True)
+    assert list(data_dictionary.keys()) == ['test_1', 'test_2']
+    assert not data_dictionary.is_loaded('test_1')
+    assert data_dictionary['test_1'].equals(df_sample)
+    assert data_dictionary.is_loaded('test_1')
+    assert not data_dictionary.is_loaded('test_2')
+    assert data_dictionary['test_1'] is data_dictionary['test_1']
+    
+    
+def test_read_data_lazy_missing_key(tmp_path, df_sample):
+    '''tests that lazy data dictionaries raise KeyError for unknown keys'''
+    
+    df_sample.to_parquet(tmp_path/'test.parquet')
+    data_dictionary = dp.ReadData.read_all_parquet(tmp_path, lazy = True)
+    assert 'missing' not in data_dictionary
+    with pytest.raises(KeyError):
+        data_dictionary['missing']
+
+
+# column and filter pushdown ##################################################
+def test_read_all_parquet_pushes_down_columns_and_filters(tmp_path, df_sample):
+    '''tests that read_all_parquet only returns selected columns and rows'''
+    
+    df_sample.to_parquet(tmp_path/'test.parquet', index = False)
+    data_dictionary = dp.ReadData.read_all_parquet(
+        tmp_path,
+        columns = ['Student Number', 'Fee Region'],
+        filters = [('Fee Region', '=', 'scot')]
+    )
+    df = data_dictionary['test']
+    assert list(df.columns) == ['Student Number', 'Fee Region']
+    assert len(df) == 3
+    
+    
+def test_read_all_feather_per_file_options(tmp_path, df_sample):
+    '''tests that dict options are applied per file in read_all_feather'''
+    
+    df_sample.to_feather(tmp_path/'test_1.feather')
+    df_sample.to_feather(tmp_path/'test_2.feather')
+    data_dictionary = dp.ReadData.read_all_feather(
+        tmp_path,
+        columns = {'test_1': ['Fees']},
+        filters = {'test_2': [('Fees', '>', 200)]}
+    )
+    assert list(data_dictionary['test_1'].columns) == ['Fees']
+    assert len(data_dictionary['test_1']) == len(df_sample)
+    assert len(data_dictionary['test_2']) == 3
+    assert len(data_dictionary['test_2'].columns) == len(df_sample.columns)
+
+
+# memory-mapped feather #######################################################
+def test_read_all_feather_memory_map(tmp_path, df_sample):
+    '''tests that memory-mapped feather reads match standard reads'''
+    
+    df_sample.to_feather(tmp_path/'test.feather', compression = 'uncompressed')
+    data_dictionary = dp.ReadData.read_all_feather(
+        tmp_path, memory_map = True
+    )
+    assert data_dictionary['test'].equals(df_sample)
+    
+    
+def test_read_all_feather_memory_map_as_arrow(tmp_path, df_sample):
+    '''tests that as_arrow returns memory-mapped pyarrow tables'''
+    
+    import pyarrow as pa
+    
+    df = pd.concat([df_sample] * 1000, ignore_index = True)
+    df.to_feather(tmp_path/'test.feather', compression = 'uncompressed')
+    allocated_bytes = pa.total_allocated_bytes()
+    data_dictionary = dp.ReadData.read_all_feather(
+        tmp_path, memory_map = True, as_arrow = True
+    )
+    table = data_dictionary['test']
+    # table buffers point into the memory map rather than new allocations
+    assert pa.total_allocated_bytes() - allocated_bytes < table.nbytes / 10
+    assert isinstance(table, pa.Table)
+    assert table.to_pandas().equals(df)
+
+
+# ReadCache ###################################################################
+def test_read_cache_serves_unchanged_files(tmp_path, df_sample):
+    '''
+    tests that cached reads match the source and are invalidated when the 
+    source file changes
+    '''
+    
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    df_sample.to_csv(data_path/'test.csv', index = False)
+    cache = dp.ReadCache(str(tmp_path/'cache'))
+    first = dp.ReadData.read_all_csv(data_path, cache = cache)
+    assert len(os.listdir(tmp_path/'cache')) == 1
+    second = dp.ReadData.read_all_csv(data_path, cache = cache)
+    assert second['test'].equals(first['test'])
+    
+    df_sample.head(2).to_csv(data_path/'test.csv', index = False)
+    os.utime(data_path/'test.csv', ns = (0, 0))
+    third = dp.ReadData.read_all_csv(data_path, cache = cache)
+    assert len(third['test']) == 2
+    assert len(os.listdir(tmp_path/'cache')) == 1
+    
+    
+def test_read_cache_evicts_and_invalidates(tmp_path, df_sample):
+    '''tests that the cache stays within max_bytes and can be cleared'''
+    
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    for i in range(3):
+        df_sample.to_csv(data_path/f'test_{i}.csv', index = False)
+    cache = dp.ReadCache(str(tmp_path/'cache'), max_bytes = 1)
+    dp.ReadData.read_all_csv(data_path, cache = cache)
+    assert len(os.listdir(tmp_path/'cache')) <= 1
+    
+    cache.max_bytes = None
+    dp.ReadData.read_all_csv(data_path, cache = cache)
+    assert len(os.listdir(tmp_path/'cache')) == 3
+    cache.invalidate(str(data_path/'test_0.csv'))
+    assert len(os.listdir(tmp_path/'cache')) == 2
+    cache.invalidate()
+    assert os.listdir(tmp_path/'cache') == list()
+
+
+def test_read_cache_keeps_entries_per_table_and_options(
+    tmp_path,
+    sqlite_path,
+    df_sample
+):
+    '''
+    tests that tables of one database and reads of one file with different
+    options are cached side by side rather than replacing each other
+    '''
+
+    cache = dp.ReadCache(str(tmp_path/'cache'))
+    for _ in range(2):
+        data_dictionary = dp.ReadData.read_all_sqlite(
+            sqlite_path, cache = cache
+        )
+        assert len(os.listdir(tmp_path/'cache')) == 2
+        assert data_dictionary['table_2'].equals(df_sample)
+
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    df_sample.to_csv(data_path/'test.csv', index = False)
+    dp.ReadData.read_all_csv(data_path, cache = cache)
+    dp.ReadData.read_all_csv(data_path, cache = cache, infer_dtypes = 3)
+    assert len(os.listdir(tmp_path/'cache')) == 4
+
+    
+def test_read_cache_keys_ignore_function_addresses(tmp_path, df_sample):
+    '''
+    tests that entries for tasks carrying functions (e.g. hive partitions) 
+    do not depend on where the function is loaded in memory
+    '''
+    
+    df_sample.to_csv(tmp_path/'test.csv', index = False)
+    cache = dp.ReadCache(str(tmp_path/'cache'))
+    entry_paths = list()
+    for _ in range(2):
+        def reader(file_path):
+            return pd.read_csv(file_path)
+        entry_paths.append(cache._entry_path(
+            str(tmp_path/'test.csv'), 
+            dp.read._read_partitioned, 
+            {'reader': reader, 'partitions': [('year', '2024')]}
+        ))
+    assert entry_paths[0] == entry_paths[1]
+    
+    
+def test_read_cache_arrow_tables(tmp_path, df_sample):
+    '''tests that as_arrow reads are cached and returned as tables'''
+    
+    import pyarrow as pa
+    
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    df_sample.to_feather(data_path/'test.feather')
+    cache = dp.ReadCache(str(tmp_path/'cache'))
+    for _ in range(2):
+        table = dp.ReadData.read_all_feather(
+            data_path, as_arrow = True, cache = cache
+        )['test']
+        assert isinstance(table, pa.Table)
+        assert len(os.listdir(tmp_path/'cache')) == 1
+
+
+# incremental reads ###########################################################
+def test_read_data_manifest_reads_only_changes(tmp_path, df_sample):
+    '''
+    tests that reads with a manifest only return new or modified files on 
+    subsequent calls
+    '''
+    
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    manifest = str(tmp_path/'manifest.json')
+    df_sample.to_csv(data_path/'test_1.csv', index = False)
+    df_sample.to_csv(data_path/'test_2.csv', index = False)
+    first = dp.ReadData.read_all_csv(data_path, manifest = manifest)
+    assert list(first) == ['test_1', 'test_2']
+    assert dp.ReadData.read_all_csv(data_path, manifest = manifest) == dict()
+    
+    df_sample.to_csv(data_path/'test_3.csv', index = False)
+    df_sample.head(2).to_csv(data_path/'test_1.csv', index = False)
+    os.utime(data_path/'test_1.csv', ns = (0, 0))
+    third = dp.ReadData.read_all_csv(data_path, manifest = manifest)
+    assert list(third) == ['test_1', 'test_3']
+    
+    
+def test_read_data_manifest_hash_skips_touched_files(tmp_path, df_sample):
+    '''tests that touched files with unchanged contents are skipped'''
+    
+    data_path = tmp_path/'data'
+    data_path.mkdir()
+    manifest = str(tmp_path/'manifest.json')
+    df_sample.to_csv(data_path/'test.csv', index = False)
+    dp.ReadData.read_all_csv(
+        data_path, manifest = manifest, hash_contents = True
+    )
+    os.utime(data_path/'test.csv', ns = (0, 0))
+    data_dictionary = dp.ReadData.read_all_csv(
+        data_path, manifest = manifest, hash_contents = True
+    )
+    assert data_dictionary == dict()
+
+
+# read_all_sqlite / stream_sqlite #############################################
+@pytest.fixture
+def sqlite_path(tmp_path, df_sample):
+    '''sqlite database containing two copies of df_sample'''
+    
+    import sqlite3
+    from contextlib import closing
+    
+    path = str(tmp_path/'test.db')
+    with closing(sqlite3.connect(path)) as conn:
+        df_sample.to_sql('table_1', conn, index = False)
+        df_sample.to_sql('table_2', conn, index = False)
+    return path
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_read_all_sqlite_reads_all_tables(sqlite_path, df_sample, max_workers):
+    '''tests that read_all_sqlite reads every table serially and in parallel'''
+    
+    data_dictionary = dp.ReadData.read_all_sqlite(
+        sqlite_path, max_workers = max_workers
+    )
+    assert list(data_dictionary) == ['table_1', 'table_2']
+    assert data_dictionary['table_1'].equals(df_sample)
+    
+    
+def test_stream_sqlite_yields_bounded_chunks(sqlite_path, df_sample):
+    '''tests that stream_sqlite yields every row in chunks of chunksize'''
+    
+    chunks = list(dp.ReadData.stream_sqlite(sqlite_path, chunksize = 4))
+    assert [name for name, _ in chunks] == [
+        'table_1', 'table_1', 'table_2', 'table_2'
+    ]
+    assert sum(len(chunk) for _, chunk in chunks) == 2 * len(df_sample)
+    
+    
+def test_read_all_sqlite_invalid_path(tmp_path):
+    '''tests that a missing database returns an empty dictionary'''
+    
+    assert dp.ReadData.read_all_sqlite(str(tmp_path/'missing.db')) == dict()
+
+
+def test_read_all_sqlite_pushes_down_columns_and_where(sqlite_path):
+    '''tests that tables, columns and where restrict what is read'''
+    
+    data_dictionary = dp.ReadData.read_all_sqlite(
+        sqlite_path,
+        tables = ['table_1'],
+        columns = ['Student Number', 'Fees'],
+        where = {'table_1': '"Fees" > 200'}
+    )
+    assert list(data_dictionary) == ['table_1']
+    assert list(data_dictionary['table_1'].columns) == [
+        'Student Number', 'Fees'
+    ]
+    assert len(data_dictionary['table_1']) == 3
+    
+    
+def test_read_all_sqlite_watermark_reads_new_rows(
+    tmp_path, 
+    sqlite_path, 
+    df_sample
+):
+    '''
+    tests that watermarked reads only return rows added since the previous 
+    read and persist the watermark
+    '''
+    
+    import sqlite3
+    from contextlib import closing
+    
+    watermark_path = str(tmp_path/'watermarks.json')
+    first = dp.ReadData.read_all_sqlite(
+        sqlite_path, watermark = 'rowid', watermark_path = watermark_path
+    )
+    assert first['table_1'].equals(df_sample)
+    with closing(sqlite3.connect(sqlite_path)) as conn:
+        df_sample.head(2).to_sql(
+            'table_1', conn, index = False, if_exists = 'append'
+        )
+        conn.commit()
+    second = dp.ReadData.read_all_sqlite(
+        sqlite_path, watermark = 'rowid', watermark_path = watermark_path
+    )
+    assert len(second['table_1']) == 2
+    assert len(second['table_2']) == 0
+    chunks = list(dp.ReadData.stream_sqlite(
+        sqlite_path, watermark = 'rowid', watermark_path = watermark_path
+    ))
+    assert sum(len(chunk) for _, chunk in chunks) == 0
+    
+    
+@pytest.mark.parametrize('options', [
+    {'columns': ['Fess']}, {'watermark': 'updated_at'}
+])
+def test_read_all_sqlite_rejects_unknown_columns(
+    tmp_path, 
+    sqlite_path, 
+    options
+):
+    '''
+    tests that unknown columns and watermarks raise rather than being read 
+    as string literals
+    '''
+    
+    watermark_path = tmp_path/'watermarks.json'
+    with pytest.raises(ValueError):
+        dp.ReadData.read_all_sqlite(
+            sqlite_path, watermark_path = str(watermark_path), **options
+        )
+    with pytest.raises(ValueError):
+        list(dp.ReadData.stream_sqlite(sqlite_path, **options))
+    assert not watermark_path.exists()
+
+
+@pytest.mark.parametrize('options', [
+    {'lazy': True}, {'combine': True}, {'nrows': 2}
+])
+def test_read_all_sqlite_watermark_rejects_options(
+    tmp_path,
+    sqlite_path,
+    options
+):
+    '''
+    tests that watermarks raise with reads that cannot strip and store them
+    '''
+
+    watermark_path = tmp_path/'watermarks.json'
+    with pytest.raises(ValueError):
+        dp.ReadData.read_all_sqlite(
+            sqlite_path,
+            watermark = 'rowid',
+            watermark_path = str(watermark_path),
+            **options
+        )
+    assert not watermark_path.exists()
+
+
+# compact csv dtypes ##########################################################
+def test_read_all_csv_infers_compact_dtypes(tmp_path, df_sample):
+    '''
+    tests that sampled dtype inference produces categories, dates and 
+    downcast integers without changing values
+    '''
+    
+    df_sample.to_csv(tmp_path/'test.csv', index = False)
+    df = dp.ReadData.read_all_csv(tmp_path, infer_dtypes = 3)['test']
+    assert df['Fee Region'].dtype == 'category'
+    assert df['Academic Year'].dtype == 'int16'
+    assert df['Student Number'].dtype == 'int32'
+    assert pd.api.types.is_datetime64_any_dtype(df['Snapshot Date'])
+    assert df['Fee Region'].astype(str).equals(df_sample['Fee Region'])
+    assert df['Student Number'].equals(
+        df_sample['Student Number'].astype('int32')
+    )
+
+
+def test_read_all_csv_infers_only_consistent_dates(tmp_path, recwarn):
+    '''
+    tests that month names, codes and relative words are not parsed as
+    dates, and that dates in one format are parsed without warnings
+    '''
+
+    pd.DataFrame({
+        'month': ['Jan', 'Feb', 'Mar', 'Jan'],
+        'code': ['1/2', '3/4', '1/2', '3/4'],
+        'when': ['now', 'today', 'now', 'today'],
+        'date': ['2024-01-03', '2024-01-04', '2024-01-13', '2024-01-14']
+    }).to_csv(tmp_path/'test.csv', index = False)
+    df = dp.ReadData.read_all_csv(tmp_path, infer_dtypes = 4)['test']
+    assert df['month'].astype(str).tolist() == ['Jan', 'Feb', 'Mar', 'Jan']
+    assert df['code'].astype(str).tolist() == ['1/2', '3/4', '1/2', '3/4']
+    assert df['when'].astype(str).tolist() == ['now', 'today', 'now', 'today']
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert not [w for w in recwarn if issubclass(w.category, UserWarning)]
+
+
+def test_read_all_csv_schema_per_file(tmp_path, df_sample):
+    '''tests that schema dtypes are applied to the named file only'''
+    
+    df_sample.to_csv(tmp_path/'test_1.csv', index = False)
+    df_sample.to_csv(tmp_path/'test_2.csv', index = False)
+    data_dictionary = dp.ReadData.read_all_csv(
+        tmp_path, 
+        schema = {'test_1': {'Fees': 'float32', 'Snapshot Date': 'datetime64'}}
+    )
+    assert data_dictionary['test_1']['Fees'].dtype == 'float32'
+    assert pd.api.types.is_datetime64_any_dtype(
+        data_dictionary['test_1']['Snapshot Date']
+    )
+    assert data_dictionary['test_2']['Fees'].dtype == 'float64'
+    
+    
+def test_read_all_csv_schema_all_files(tmp_path, df_sample):
+    '''tests that a flat schema is applied to every file'''
+    
+    df_sample.to_csv(tmp_path/'test_1.csv', index = False)
+    df_sample.to_csv(tmp_path/'test_2.csv', index = False)
+    data_dictionary = dp.ReadData.read_all_csv(
+        tmp_path, schema = {'Fees': 'float32'}
+    )
+    for df in data_dictionary.values():
+        assert df['Fees'].dtype == 'float32'
+
+
+# pyarrow engine ##############################################################
+def test_read_all_csv_pyarrow_engine(tmp_path, df_sample):
+    '''tests that the pyarrow engine reads the same values as the default'''
+    
+    df_sample.to_csv(tmp_path/'test.csv', index = False)
+    default = dp.ReadData.read_all_csv(tmp_path)['test']
+    arrow = dp.ReadData.read_all_csv(
+        tmp_path, engine = 'pyarrow', dtype_backend = 'pyarrow'
+    )['test']
+    assert all(str(dtype).endswith('[pyarrow]') for dtype in arrow.dtypes)
+    assert arrow['Fees'].tolist() == default['Fees'].tolist()
+    
+    
+def test_read_all_json_pyarrow_engine(tmp_path, df_sample):
+    '''tests that the pyarrow engine reads line-delimited json'''
+    
+    df_sample.to_json(tmp_path/'test.json', orient = 'records', lines = True)
+    df = dp.ReadData.read_all_json(tmp_path, engine = 'pyarrow')['test']
+    assert df['Student Number'].tolist() == \
+        df_sample['Student Number'].tolist()
+
+
+# recursive and hive-partitioned reads ########################################
+@pytest.fixture
+def partitioned_path(tmp_path, df_sample):
+    '''hive-partitioned directory of df_sample by year and month'''
+    
+    for year in [2023, 2024]:
+        for month in [1, 2]:
+            partition_path = tmp_path/f'year={year}'/f'month={month}'
+            partition_path.mkdir(parents = True)
+            df_sample.to_parquet(partition_path/'part-0.parquet')
+    return tmp_path
+
+
+def test_read_all_parquet_recursive(partitioned_path):
+    '''tests that recursive reads name files by their relative path'''
+    
+    assert dp.ReadData.read_all_parquet(partitioned_path) == dict()
+    data_dictionary = dp.ReadData.read_all_parquet(
+        partitioned_path, recursive = True, pattern = 'year=2024/*'
+    )
+    assert list(data_dictionary) == [
+        'year=2024/month=1/part-0', 'year=2024/month=2/part-0'
+    ]
+    
+    
+def test_read_all_parquet_hive_partitions(partitioned_path, df_sample):
+    '''
+    tests that hive partitions are added as columns and pruned by partition 
+    filters
+    '''
+    
+    data_dictionary = dp.ReadData.read_all_parquet(
+        partitioned_path,
+        recursive = True,
+        partitioning = 'hive',
+        partition_filters = [('year', '=', 2024), ('month', 'in', [2, 3])],
+        max_workers = 2
+    )
+    assert list(data_dictionary) == ['year=2024/month=2/part-0']
+    df = data_dictionary['year=2024/month=2/part-0']
+    assert (df['year'] == 2024).all() and (df['month'] == 2).all()
+    assert df.drop(columns = ['year', 'month']).equals(df_sample)
+
+
+def test_read_all_parquet_hive_implies_recursive(partitioned_path):
+    '''tests that hive partitioning reads partition directories'''
+
+    data_dictionary = dp.ReadData.read_all_parquet(
+        partitioned_path, partitioning = 'hive'
+    )
+    assert len(data_dictionary) == 4
+    assert not data_dictionary.errors
+
+
+@pytest.mark.parametrize('reader, write', [
+    (dp.ReadData.read_all_parquet, 'to_parquet'),
+    (dp.ReadData.read_all_feather, 'to_feather')
+])
+def test_read_data_filters_on_partition_keys(
+    tmp_path,
+    df_sample,
+    reader,
+    write
+):
+    '''
+    tests that row filters on partition keys prune partitions and are not
+    pushed down to files, which lack those columns
+    '''
+
+    for year in [2023, 2024]:
+        partition_path = tmp_path/f'year={year}'
+        partition_path.mkdir()
+        getattr(df_sample, write)(partition_path/f'part-0.{write[3:]}')
+    data_dictionary = reader(
+        tmp_path,
+        partitioning = 'hive',
+        filters = [('year', '=', 2024), ('Fees', '>', 200)]
+    )
+    assert not data_dictionary.errors
+    assert list(data_dictionary) == ['year=2024/part-0']
+    df = data_dictionary['year=2024/part-0']
+    assert (df['year'] == 2024).all()
+    assert df['Fees'].tolist() == [400.5, 234, 1900.0133]
+
+    data_dictionary = reader(
+        tmp_path,
+        partitioning = 'hive',
+        filters = {'year=2023/part-0': [('year', '=', 2024)]}
+    )
+    assert len(data_dictionary['year=2023/part-0']) == 0
+    assert len(data_dictionary['year=2024/part-0']) == len(df_sample)
+
+
+# combined reads ##############################################################
+@pytest.mark.parametrize('reader, write', [
+    (dp.ReadData.read_all_csv, 'to_csv'),
+    (dp.ReadData.read_all_parquet, 'to_parquet')
+])
+def test_read_data_combine(tmp_path, df_sample, reader, write):
+    '''
+    tests that combine returns a single frame of all files with a 
+    categorical source column
+    '''
+    
+    for i in range(3):
+        file_path = tmp_path/f'test_{i}.{write[3:]}'
+        getattr(df_sample, write)(file_path, index = False)
+    df = reader(tmp_path, combine = True, source_column = 'source_file')
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 3 * len(df_sample)
+    assert df['source_file'].dtype == 'category'
+    assert df['source_file'].value_counts().to_dict() == {
+        'test_0': 6, 'test_1': 6, 'test_2': 6
+    }
+    assert df['Fees'].tolist() == 3 * df_sample['Fees'].tolist()
+    
+    
+def test_read_data_combine_records_errors(tmp_path, df_sample):
+    '''tests that combined reads skip and record failed files'''
+    
+    df_sample.to_parquet(tmp_path/'good.parquet')
+    (tmp_path/'bad.parquet').write_bytes(b'not a parquet file')
+    df = dp.ReadData.read_all_parquet(tmp_path, combine = True)
+    assert df.equals(df_sample)
+    assert list(df.attrs['errors']) == ['bad']
+
+
+def test_read_data_combine_mismatched_types(tmp_path):
+    '''
+    tests that columns with different types across files are combined as
+    pd.concat would combine them
+    '''
+
+    frames = [
+        pd.DataFrame({'a': [1, 2], 'b': [1, 2]}),
+        pd.DataFrame({'a': [1.5, None], 'b': ['x', 'y']})
+    ]
+    for i, frame in enumerate(frames):
+        frame.to_csv(tmp_path/f'test_{i}.csv', index = False)
+    df = dp.ReadData.read_all_csv(
+        tmp_path, combine = True, source_column = 'source_file'
+    )
+    expected = pd.concat(frames, ignore_index = True)
+    assert df['a'].dtype == 'float64'
+    assert df['a'].equals(expected['a'])
+    assert df['b'].tolist() == expected['b'].tolist()
+    assert df['source_file'].dtype == 'category'
+    assert df['source_file'].tolist() == ['test_0'] * 2 + ['test_1'] * 2
+
+
+def test_read_data_combine_keeps_named_index(tmp_path, df_sample):
+    '''tests that combine keeps a named index of every file'''
+
+    df_sample = df_sample.set_index('Student Number')
+    df_sample.iloc[:3].to_pickle(tmp_path/'test_1.pickle')
+    df_sample.iloc[3:].to_pickle(tmp_path/'test_2.pickle')
+    df = dp.ReadData.read_all_pickle(tmp_path, combine = True)
+    assert df.index.name == 'Student Number'
+    assert df.index.tolist() == df_sample.index.tolist()
+
+
+# compressed files ############################################################
+def test_read_data_reads_compressed_files(tmp_path, df_sample):
+    '''
+    tests that compressed csv and json files are read alongside uncompressed
+    files and named without their extensions
+    '''
+    
+    df_sample.to_csv(tmp_path/'test_1.csv', index = False)
+    df_sample.to_csv(tmp_path/'test_2.csv.gz', index = False)
+    df_sample.to_csv(tmp_path/'test_3.csv.bz2', index = False)
+    df_sample.to_json(tmp_path/'test_4.json.gz')
+    data_dictionary = dp.ReadData.read_all_csv(tmp_path, max_workers = 2)
+    assert list(data_dictionary) == ['test_1', 'test_2', 'test_3']
+    assert data_dictionary['test_2'].equals(data_dictionary['test_1'])
+    assert dp.ReadData.read_all_json(tmp_path)['test_4'].equals(df_sample)
+    
+    
+def test_stream_csv_reads_compressed_files(tmp_path, df_sample):
+    '''tests that compressed csv files are decompressed while streaming'''
+    
+    df_sample.to_csv(tmp_path/'test.csv.gz', index = False)
+    chunks = list(dp.ReadData.stream_csv(tmp_path, chunksize = 4))
+    assert [len(chunk) for _, chunk in chunks] == [4, 2]
+
+
+# aread_all ###################################################################
+def test_aread_all_matches_read_all(tmp_path, df_sample):
+    '''tests that aread_all returns the same data as read_all'''
+    
+    import asyncio
+    
+    df_sample.to_parquet(tmp_path/'test_1.parquet')
+    df_sample.to_pickle(tmp_path/'test_2.pickle')
+    (tmp_path/'bad.parquet').write_bytes(b'not a parquet file')
+    data_dictionary = asyncio.run(
+        dp.ReadData.aread_all(tmp_path, max_concurrency = 2)
+    )
+    assert list(data_dictionary) == ['test_1', 'test_2']
+    assert data_dictionary['test_1'].equals(df_sample)
+    assert 'bad' in data_dictionary.errors
+
+
+def test_aread_all_scans_off_event_loop(tmp_path, df_sample, monkeypatch):
+    '''tests that aread_all scans the directory outside the event loop'''
+
+    import asyncio
+    import threading
+
+    scan_threads = list()
+    scan_files = dp.read._scan_files
+
+    def record_scan(*args, **kwargs):
+        scan_threads.append(threading.current_thread())
+        return scan_files(*args, **kwargs)
+
+    monkeypatch.setattr(dp.read, '_scan_files', record_scan)
+    df_sample.to_parquet(tmp_path/'test.parquet')
+    data_dictionary = asyncio.run(dp.ReadData.aread_all(tmp_path))
+    assert list(data_dictionary) == ['test']
+    assert scan_threads and threading.main_thread() not in scan_threads
+
+
+# read stats ##################################################################
+def test_read_data_records_stats(tmp_path, df_sample):
+    '''tests that per-file read stats are attached to the data dictionary'''
+    
+    df_sample.to_csv(tmp_path/'test_1.csv', index = False)
+    df_sample.head(2).to_csv(tmp_path/'test_2.csv', index = False)
+    data_dictionary = dp.ReadData.read_all_csv(tmp_path, max_workers = 2)
+    stats = data_dictionary.stats
+    assert list(stats.index) == ['test_1', 'test_2']
+    assert stats['rows'].tolist() == [6, 2]
+    assert stats['columns'].tolist() == [7, 7]
+    assert stats.loc['test_1', 'bytes'] == \
+        os.path.getsize(tmp_path/'test_1.csv')
+    assert (stats['seconds'] > 0).all()
+    assert (stats['memory_bytes'] > 0).all()
+    
+    
+def test_read_data_lazy_records_stats(tmp_path, df_sample):
+    '''tests that lazy data dictionaries record stats as files are read'''
+    
+    df_sample.to_parquet(tmp_path/'test_1.parquet')
+    df_sample.to_parquet(tmp_path/'test_2.parquet')
+    data_dictionary = dp.ReadData.read_all_parquet(tmp_path, lazy = True)
+    assert data_dictionary.stats.empty
+    data_dictionary['test_2']
+    assert list(data_dictionary.stats.index) == ['test_2']
+
+
+# multi-sheet xlsx ############################################################
+@pytest.fixture
+def workbook_path(tmp_path, df_sample):
+    '''directory containing a workbook with three sheets of df_sample'''
+    
+    with pd.ExcelWriter(tmp_path/'test.xlsx') as writer:
+        for sheet in ['first', 'second', 'third']:
+            df_sample.to_excel(writer, sheet_name = sheet, index = False)
+    return tmp_path
+
+
+@pytest.mark.parametrize('engine', [None, 'openpyxl'])
+def test_read_all_xlsx_all_sheets(workbook_path, df_sample, engine):
+    '''tests that all sheets are read and keyed workbook.sheet'''
+    
+    data_dictionary = dp.ReadData.read_all_xlsx(
+        workbook_path, sheets = 'all', engine = engine
+    )
+    assert list(data_dictionary) == ['test.first', 'test.second', 'test.third']
+    assert data_dictionary['test.second']['Fees'].tolist() == \
+        df_sample['Fees'].tolist()
+    assert data_dictionary.stats.loc['test', 'rows'] == 3 * len(df_sample)
+    
+    
+def test_read_all_xlsx_named_sheets(workbook_path):
+    '''tests that only named sheets are read'''
+    
+    data_dictionary = dp.ReadData.read_all_xlsx(
+        workbook_path, sheets = ['third']
+    )
+    assert list(data_dictionary) == ['test.third']
+    assert list(dp.ReadData.read_all_xlsx(workbook_path)) == ['test']
+    assert list(
+        dp.ReadData.read_all_xlsx(workbook_path, sheets = 'first')
+    ) == ['test.first']
+    
+    
+def test_read_all_xlsx_sheets_cached(workbook_path, tmp_path, df_sample):
+    '''tests that every sheet of a workbook is cached and served'''
+    
+    cache = dp.ReadCache(str(tmp_path/'cache'))
+    first = dp.ReadData.read_all_xlsx(
+        workbook_path, sheets = 'all', cache = cache
+    )
+    assert len(os.listdir(tmp_path/'cache')) == 3
+    second = dp.ReadData.read_all_xlsx(
+        workbook_path, sheets = 'all', cache = cache
+    )
+    assert list(second) == list(first)
+    assert second['test.third'].equals(first['test.third'])
+    
+    
+def test_read_all_xlsx_sheets_lazy(workbook_path, df_sample):
+    '''tests that lazy reads list and serve workbook.sheet keys'''
+    
+    data_dictionary = dp.ReadData.read_all_xlsx(
+        workbook_path, sheets = 'all', lazy = True
+    )
+    assert list(data_dictionary) == ['test.first', 'test.second', 'test.third']
+    assert len(data_dictionary['test.second']) == len(df_sample)
+    assert data_dictionary.is_loaded('test.third')
+    
+    
+def test_read_all_xlsx_sheets_combined(workbook_path, df_sample):
+    '''tests that combined sheets are labelled workbook.sheet'''
+    
+    df = dp.ReadData.read_all_xlsx(
+        workbook_path, 
+        sheets = ['first', 'third'], 
+        combine = True, 
+        source_column = 'source'
+    )
+    assert df['source'].value_counts().to_dict() == {
+        'test.first': len(df_sample), 'test.third': len(df_sample)
+    }
+
+
+# sampled reads ###############################################################
+@pytest.fixture
+def large_sample():
+    '''larger numeric frame for sampling tests'''
+    
+    return pd.DataFrame({'id': range(10_000), 'value': range(0, 20_000, 2)})
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'feather', 'json'])
+def test_read_all_nrows(tmp_path, large_sample, file_format):
+    '''tests that nrows reads only the head of each file'''
+    
+    if file_format == 'json':
+        large_sample.to_json(tmp_path/'test.json', orient = 'records')
+    elif file_format == 'csv':
+        large_sample.to_csv(tmp_path/'test.csv', index = False)
+    else:
+        writer = getattr(large_sample, f'to_{file_format}')
+        writer(tmp_path/f'test.{file_format}')
+    data_dictionary = dp.ReadData.read_all(
+        tmp_path, formats = [file_format], nrows = 5
+    )
+    assert data_dictionary['test']['id'].tolist() == list(range(5))
+    
+    
+def test_read_all_csv_sample_fraction(tmp_path, large_sample):
+    '''tests that csv byte-range samples contain whole, valid rows'''
+    
+    large_sample.to_csv(tmp_path/'test.csv', index = False)
+    df = dp.ReadData.read_all_csv(
+        tmp_path, sample_fraction = 0.1, random_state = 0
+    )['test']
+    assert 0 < len(df) < len(large_sample) / 2
+    assert (df['value'] == 2 * df['id']).all()
+    assert df['id'].is_unique
+    
+    
+def test_read_all_parquet_sample_fraction(tmp_path, large_sample):
+    '''tests that parquet samples whole row groups'''
+    
+    large_sample.to_parquet(tmp_path/'test.parquet', row_group_size = 1_000)
+    df = dp.ReadData.read_all_parquet(
+        tmp_path, sample_fraction = 0.2, random_state = 0
+    )['test']
+    assert len(df) == 2_000
+    assert (df['value'] == 2 * df['id']).all()
+    
+    
+def test_read_all_sqlite_nrows(sqlite_path):
+    '''tests that nrows limits sqlite reads'''
+    
+    data_dictionary = dp.ReadData.read_all_sqlite(sqlite_path, nrows = 2)
+    assert all(len(df) == 2 for df in data_dictionary.values())
+    
+    
+def test_read_all_sampling_options_conflict(tmp_path, large_sample):
+    '''tests that nrows and sample_fraction cannot be combined'''
+    
+    large_sample.to_csv(tmp_path/'test.csv', index = False)
+    with pytest.raises(ValueError):
+        dp.ReadData.read_all_csv(tmp_path, nrows = 5, sample_fraction = 0.5)
+    with pytest.raises(ValueError):
+        dp.ReadData.read_all_csv(
+            tmp_path, nrows = 5, manifest = str(tmp_path/'manifest.json')
+        )
+
+
+@pytest.mark.parametrize('sample_fraction', [0, -0.5, 2.0])
+@pytest.mark.parametrize('reader, write', [
+    (dp.ReadData.read_all_csv, 'to_csv'),
+    (dp.ReadData.read_all_parquet, 'to_parquet')
+])
+def test_read_all_sample_fraction_out_of_range(
+    tmp_path,
+    large_sample,
+    sample_fraction,
+    reader,
+    write
+):
+    '''tests that sample fractions outside (0, 1] raise for every format'''
+
+    getattr(large_sample, write)(tmp_path/f'test.{write[3:]}', index = False)
+    with pytest.raises(ValueError):
+        reader(tmp_path, sample_fraction = sample_fraction)
+
+
+
+@pytest.mark.parametrize('options', [
+    {'nrows': 3}, {'sample_fraction': 0.5, 'random_state': 0}
+])
+def test_read_all_feather_memory_map_sampled(tmp_path, large_sample, options):
+    '''tests that memory-mapped feather samples return pyarrow tables'''
+    
+    import pyarrow as pa
+    
+    large_sample.to_feather(tmp_path/'test.feather')
+    table = dp.ReadData.read_all_feather(
+        tmp_path, memory_map = True, as_arrow = True, **options
+    )['test']
+    assert isinstance(table, pa.Table)
+    assert 0 < table.num_rows < len(large_sample)
+
+
+# csv sniffing ################################################################
+@pytest.mark.parametrize('seperator', [';', '\t', '|'])
+def test_read_all_csv_sniffs_delimiter(tmp_path, df_sample, seperator):
+    '''tests that seperator = 'auto' detects the delimiter of each file'''
+    
+    df_sample.to_csv(tmp_path/'test.csv', sep = seperator, index = False)
+    df = dp.ReadData.read_all_csv(tmp_path, seperator = 'auto')['test']
+    assert list(df.columns) == list(df_sample.columns)
+    assert df['Fees'].tolist() == df_sample['Fees'].tolist()
+    
+    
+@pytest.mark.parametrize('encoding', ['utf-8-sig', 'utf-16', 'cp1252'])
+def test_read_all_csv_sniffs_encoding(tmp_path, encoding):
+    '''tests that byte order marks and non utf-8 encodings are detected'''
+    
+    df_accents = pd.DataFrame({'name': ['café', 'naïve'], 'count': [1, 2]})
+    df_accents.to_csv(tmp_path/'test.csv', encoding = encoding, index = False)
+    df = dp.ReadData.read_all_csv(tmp_path, seperator = 'auto')['test']
+    assert list(df.columns) == ['name', 'count']
+    assert df['name'].tolist() == ['café', 'naïve']
+    
+    
+def test_read_all_csv_sniffs_header(tmp_path):
+    '''tests that files without a header row are detected'''
+    
+    (tmp_path/'test.csv').write_text('1;alpha\n2;beta\n3;gamma\n')
+    df = dp.ReadData.read_all_csv(tmp_path, seperator = 'auto')['test']
+    assert len(df) == 3
+    assert df[1].tolist() == ['alpha', 'beta', 'gamma']
+    
+    
+def test_sniff_csv_cached_per_fingerprint(tmp_path, df_sample):
+    '''tests that sniffed options are reused until the file changes'''
+    
+    file_path = str(tmp_path/'test.csv')
+    df_sample.to_csv(file_path, sep = ';', index = False)
+    assert dp.read._sniff_csv(file_path) is dp.read._sniff_csv(file_path)
+    df_sample.to_csv(file_path, sep = '|', index = False)
+    os.utime(file_path, ns = (0, 0))
+    assert dp.read._sniff_csv(file_path)['sep'] == '|'
@@ -301,4 +301,409 @@ def test_write_dict_to_pickle_correct_files(df_sample, tmp_path):
     )
 
 # write_dict_to_sqlite ########################################################
-# def test_write_dict_to_sqlite(df_sample):
\ No newline at end of file
+# def test_write_dict_to_sqlite(df_sample):
+
+# awrite_dict #################################################################
+@pytest.mark.parametrize('file_format', ['parquet', 'csv', 'sqlite'])
+def test_awrite_dict_writes_all_frames(df_sample, tmp_path, file_format):
+    '''tests that awrite_dict writes the same output as write_dict_to_*'''
+    
+    import asyncio
+    
+    sample_dictionary = {'df_1_key': df_sample, 'df_2_key': df_sample}
+    path = tmp_path/'test.db' if file_format == 'sqlite' else tmp_path
+    asyncio.run(dp.WriteData.awrite_dict(
+        sample_dictionary, path, file_format, max_concurrency = 2
+    ))
+    if file_format == 'sqlite':
+        tables = dp.ReadData.read_all_sqlite(str(path))
+        assert list(tables) == ['df_1_key', 'df_2_key']
+    else:
+        assert sorted(os.listdir(tmp_path)) == [
+            f'df_1_key.{file_format}', f'df_2_key.{file_format}'
+        ]
+        
+        
+def test_awrite_dict_unsupported_format(df_sample, tmp_path):
+    '''tests that unsupported formats raise ValueError'''
+    
+    import asyncio
+    
+    with pytest.raises(ValueError):
+        asyncio.run(dp.WriteData.awrite_dict(
+            {'df_1_key': df_sample}, tmp_path, 'txt'
+        ))
+        
+        
+# concurrent writes ###########################################################
+@pytest.mark.parametrize('file_format, executor', [
+    ('parquet', None), ('feather', None), ('csv', 'thread'), ('json', None)
+])
+def test_write_dict_concurrent(df_sample, tmp_path, file_format, executor):
+    '''tests that max_workers writes every frame and reports bytes written'''
+    
+    sample_dictionary = {f'df_{i}_key': df_sample for i in range(4)}
+    write = getattr(dp.WriteData, f'write_dict_to_{file_format}')
+    result = write(
+        sample_dictionary, tmp_path, max_workers = 2, executor = executor
+    )
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        f'df_{i}_key.{file_format}' for i in range(4)
+    )
+    assert result.bytes_written == sum(
+        os.path.getsize(tmp_path/filename) for filename in os.listdir(tmp_path)
+    )
+    assert result.errors == dict()
+    
+    
+def test_write_dict_records_errors(df_sample, tmp_path):
+    '''tests that a failed write is recorded without stopping the batch'''
+    
+    df_invalid = df_sample.copy()
+    df_invalid.columns = [0] * len(df_invalid.columns)
+    result = dp.WriteData.write_dict_to_parquet(
+        {'df_1_key': df_sample, 'df_2_key': df_invalid}, 
+        tmp_path, 
+        max_workers = 2
+    )
+    assert list(result) == ['df_1_key']
+    assert list(result.errors) == ['df_2_key']
+
+
+# bulk sqlite writes ##########################################################
+@pytest.mark.parametrize('pragmas', [
+    dict(), {'journal_mode': 'WAL', 'synchronous': 'OFF'}
+])
+def test_write_dict_to_sqlite_bulk_matches_to_sql(
+    df_sample, tmp_path, pragmas
+):
+    '''tests that bulk writes produce the same tables as to_sql'''
+    
+    import sqlite3
+    
+    df_sample = df_sample.assign(Date = pd.Timestamp('2024-09-01'))
+    df_sample.loc[0, 'Fees'] = None
+    sample_dictionary = {'table_1': df_sample, 'table_2': df_sample}
+    dp.WriteData.write_dict_to_sqlite(sample_dictionary, tmp_path/'to_sql.db')
+    dp.WriteData.write_dict_to_sqlite(
+        sample_dictionary, tmp_path/'bulk.db', bulk = True, **pragmas
+    )
+    for table in sample_dictionary:
+        query = f'SELECT * FROM {table}'
+        with sqlite3.connect(tmp_path/'to_sql.db') as conn:
+            expected = conn.execute(query).fetchall()
+        with sqlite3.connect(tmp_path/'bulk.db') as conn:
+            assert conn.execute(query).fetchall() == expected
+
+
+def test_write_dict_to_sqlite_bulk_converts_like_to_sql(tmp_path):
+    '''
+    tests that bulk writes keep utc offsets, write timedeltas as integers
+    and format each datetime as to_sql does regardless of chunk
+    '''
+
+    import sqlite3
+
+    dates = pd.to_datetime(
+        ['2024-01-01 00:00:00', '2024-01-02 00:00:00.5', None],
+        format = 'ISO8601'
+    )
+    df = pd.DataFrame({
+        'aware': dates.tz_localize('Europe/London'),
+        'naive': dates,
+        'duration': pd.to_timedelta(['1s', '2s', '3s'])
+    })
+    dp.WriteData.write_dict_to_sqlite({'table_1': df}, tmp_path/'to_sql.db')
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df}, tmp_path/'bulk.db', bulk = True, chunksize = 1
+    )
+    query = 'SELECT aware, naive, duration, typeof(duration) FROM table_1'
+    with sqlite3.connect(tmp_path/'to_sql.db') as conn:
+        expected = conn.execute(query).fetchall()
+    with sqlite3.connect(tmp_path/'bulk.db') as conn:
+        assert conn.execute(query).fetchall() == expected
+    assert expected[0][0] == '2024-01-01 00:00:00+00:00'
+    assert expected[1][1] == '2024-01-02 00:00:00.500000'
+    assert expected[0][3] == 'integer'
+
+
+def test_write_dict_to_sqlite_bulk_indexes(df_sample, tmp_path):
+    '''tests that existing and requested indexes exist after a bulk load'''
+    
+    import sqlite3
+    
+    path = tmp_path/'test.db'
+    dp.WriteData.write_dict_to_sqlite({'table_1': df_sample}, path)
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df_sample}, 
+        path, 
+        bulk = True, 
+        indexes = {'table_1': ['Fee Region']}
+    )
+    with sqlite3.connect(path) as conn:
+        indexes = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).fetchall()
+        rows = conn.execute('SELECT COUNT(*) FROM table_1').fetchone()[0]
+    assert sorted(indexes) == [
+        ('ix_table_1_Fee Region',), ('ix_table_1_index',)
+    ]
+    assert rows == 2 * len(df_sample)
+    
+    
+def test_write_dict_to_sqlite_bulk_rolls_back(df_sample, tmp_path):
+    '''tests that a failed bulk write raises and leaves no tables behind'''
+    
+    import sqlite3
+    
+    path = tmp_path/'test.db'
+    df_invalid = df_sample.assign(Fees = [object()] * len(df_sample))
+    with pytest.raises(sqlite3.Error):
+        dp.WriteData.write_dict_to_sqlite(
+            {'table_1': df_sample, 'table_2': df_invalid}, path, bulk = True
+        )
+    assert list(dp.ReadData.read_all_sqlite(str(path))) == list()
+    
+    
+def test_write_dict_to_sqlite_bulk_overwrite_keeps_database(
+    df_sample, 
+    tmp_path
+):
+    '''tests that a failed bulk overwrite keeps the existing database'''
+    
+    import sqlite3
+    
+    path = tmp_path/'test.db'
+    dp.WriteData.write_dict_to_sqlite(
+        {'keep': df_sample, 'table_1': df_sample}, path
+    )
+    df_invalid = df_sample.assign(Fees = [object()] * len(df_sample))
+    with pytest.raises(sqlite3.Error):
+        dp.WriteData.write_dict_to_sqlite(
+            {'table_1': df_invalid}, path, overwrite = True, bulk = True
+        )
+    tables = dp.ReadData.read_all_sqlite(str(path))
+    assert list(tables) == ['keep', 'table_1']
+    assert len(tables['table_1']) == len(df_sample)
+
+
+# sqlite upserts ##############################################################
+def test_write_dict_to_sqlite_upsert(df_sample, tmp_path):
+    '''tests that key_columns inserts new rows and updates changed rows'''
+    
+    path = tmp_path/'test.db'
+    keys = ['Student Number', 'Academic Year']
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df_sample}, path, key_columns = keys
+    )
+    df_update = df_sample.copy()
+    df_update.loc[0, 'Fees'] = 1.0
+    df_update.loc[6] = df_update.loc[1]
+    df_update.loc[6, 'Student Number'] = 999999
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df_update}, path, key_columns = {'table_1': keys}
+    )
+    df = dp.ReadData.read_all_sqlite(str(path))['table_1']
+    assert len(df) == len(df_update)
+    assert df.set_index('Student Number').loc[123456, 'Fees'] == 1.0
+    assert 'index' not in df.columns
+    
+    
+def test_write_dict_to_sqlite_upsert_skips_unchanged(df_sample, tmp_path):
+    '''tests that only changed rows are updated by an upsert'''
+    
+    import sqlite3
+    
+    path = tmp_path/'test.db'
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df_sample}, path, key_columns = ['Student Number']
+    )
+    with sqlite3.connect(path) as conn:
+        conn.executescript('''
+            CREATE TABLE updates (student INTEGER);
+            CREATE TRIGGER log_updates AFTER UPDATE ON table_1 
+            BEGIN INSERT INTO updates VALUES (NEW."Student Number"); END;
+        ''')
+    df_update = df_sample.copy()
+    df_update.loc[2, 'Fees'] = 1.0
+    dp.WriteData.write_dict_to_sqlite(
+        {'table_1': df_update}, path, key_columns = ['Student Number']
+    )
+    with sqlite3.connect(path) as conn:
+        updates = conn.execute('SELECT student FROM updates').fetchall()
+    assert updates == [(123458,)]
+
+
+# parquet layout ##############################################################
+def test_write_dict_to_parquet_partitioned(df_sample, tmp_path):
+    '''tests that partition_cols writes a hive-partitioned dataset'''
+    
+    result = dp.WriteData.write_dict_to_parquet(
+        {'df_1_key': df_sample}, tmp_path, partition_cols = ['Fee Region']
+    )
+    assert sorted(os.listdir(tmp_path/'df_1_key')) == [
+        'Fee Region=international', 'Fee Region=rUK', 'Fee Region=scot'
+    ]
+    assert result.bytes_written > 0
+    df = dp.ReadData.read_all_parquet(
+        tmp_path/'df_1_key', 
+        recursive = True, 
+        partitioning = 'hive', 
+        combine = True
+    )
+    assert sorted(df['Student Number']) == sorted(df_sample['Student Number'])
+    
+    
+def test_write_dict_to_parquet_replaces_partitions(df_sample, tmp_path):
+    '''tests that rewriting a partition leaves other partitions untouched'''
+    
+    dp.WriteData.write_dict_to_parquet(
+        {'df_1_key': df_sample}, tmp_path, partition_cols = ['Fee Region']
+    )
+    df_update = df_sample[df_sample['Fee Region'] == 'scot'].head(1)
+    dp.WriteData.write_dict_to_parquet(
+        {'df_1_key': df_update}, tmp_path, partition_cols = ['Fee Region']
+    )
+    df = pd.read_parquet(tmp_path/'df_1_key')
+    assert len(df) == len(df_sample) - 2
+    
+    
+def test_write_dict_to_parquet_layout(df_sample, tmp_path):
+    '''tests that row groups, compression and statistics are written'''
+    
+    import pyarrow.parquet as pq
+    
+    dp.WriteData.write_dict_to_parquet(
+        {'df_1_key': df_sample}, 
+        tmp_path, 
+        row_group_size = 2, 
+        compression = 'zstd'
+    )
+    metadata = pq.ParquetFile(tmp_path/'df_1_key.parquet').metadata
+    assert metadata.num_row_groups == 3
+    column = metadata.row_group(0).column(0)
+    assert column.compression == 'ZSTD'
+    assert column.statistics.has_min_max
+
+
+def test_write_dict_to_sqlite_upsert_index_keys(df_sample, tmp_path):
+    '''tests that key_columns may name the dataframe index'''
+    
+    path = tmp_path/'test.db'
+    df_indexed = df_sample.set_index('Student Number')
+    for _ in range(2):
+        dp.WriteData.write_dict_to_sqlite(
+            {'table_1': df_indexed}, path, key_columns = ['Student Number']
+        )
+    df = dp.ReadData.read_all_sqlite(str(path))['table_1']
+    assert sorted(df['Student Number']) == sorted(df_sample['Student Number'])
+    
+    
+def test_write_dict_to_sqlite_upsert_unknown_keys(df_sample, tmp_path):
+    '''tests that unknown key_columns raise rather than collapsing rows'''
+    
+    path = tmp_path/'test.db'
+    with pytest.raises(ValueError):
+        dp.WriteData.write_dict_to_sqlite(
+            {'table_1': df_sample}, path, key_columns = ['Student Numbr']
+        )
+    with pytest.raises(ValueError):
+        with dp.SqliteStreamWriter(
+            path, 'table_1', key_columns = ['Student Numbr']
+        ) as writer:
+            writer.write(df_sample)
+    assert list(dp.ReadData.read_all_sqlite(str(path))) == list()
+
+
+def test_write_dict_to_sqlite_upsert_null_keys(df_sample, tmp_path):
+    '''tests that null key values raise rather than duplicating rows'''
+
+    path = tmp_path/'test.db'
+    df_null = df_sample.astype({'Student Number': 'float64'})
+    df_null.loc[0, 'Student Number'] = None
+    with pytest.raises(ValueError):
+        dp.WriteData.write_dict_to_sqlite(
+            {'table_1': df_null}, path, key_columns = ['Student Number']
+        )
+    with pytest.raises(ValueError):
+        with dp.SqliteStreamWriter(
+            path, 'table_1', key_columns = ['Student Number']
+        ) as writer:
+            writer.write(df_null)
+    assert list(dp.ReadData.read_all_sqlite(str(path))) == list()
+
+
+# streaming writers ###########################################################
+def chunk_sample(df_sample, chunks = 3):
+    '''yields chunks of df_sample with shuffled column order'''
+    
+    for i in range(chunks):
+        chunk = df_sample.iloc[i * 2:(i + 1) * 2]
+        yield chunk[list(reversed(chunk.columns))] if i else chunk
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'feather'])
+def test_write_stream_files(df_sample, tmp_path, file_format):
+    '''tests that chunks are appended to one file with a fixed schema'''
+    
+    path = tmp_path/f'test.{file_format}'
+    rows = dp.WriteData.write_stream(
+        chunk_sample(df_sample), path, file_format
+    )
+    df = dp.ReadData.read_all(tmp_path, formats = [file_format])['test']
+    assert rows == len(df_sample)
+    assert list(df.columns) == list(df_sample.columns)
+    assert df['Student Number'].tolist() == \
+        df_sample['Student Number'].tolist()
+    
+    
+def test_write_stream_sqlite(df_sample, tmp_path):
+    '''tests that chunks are written to a sqlite table'''
+    
+    path = tmp_path/'test.db'
+    dp.WriteData.write_stream(
+        chunk_sample(df_sample), path, 'sqlite', table = 'table_1'
+    )
+    df = dp.ReadData.read_all_sqlite(str(path))['table_1']
+    assert list(df.columns) == list(df_sample.columns)
+    assert len(df) == len(df_sample)
+    
+    
+def test_write_stream_sqlite_rolls_back(df_sample, tmp_path):
+    '''tests that a failing chunk pipeline commits nothing to sqlite'''
+    
+    def failing_chunks():
+        yield from chunk_sample(df_sample, 2)
+        raise RuntimeError('pipeline failed')
+        
+    path = tmp_path/'test.db'
+    with pytest.raises(RuntimeError):
+        dp.WriteData.write_stream(
+            failing_chunks(), path, 'sqlite', table = 'table_1'
+        )
+    assert list(dp.ReadData.read_all_sqlite(str(path))) == list()
+    
+    
+def test_feather_stream_writer_ipc_stream(df_sample, tmp_path):
+    '''tests that stream = True writes an arrow ipc stream'''
+    
+    import pyarrow as pa
+    
+    path = tmp_path/'test.arrows'
+    with dp.FeatherStreamWriter(path, stream = True) as writer:
+        writer.write_all(chunk_sample(df_sample))
+    with pa.ipc.open_stream(path) as reader:
+        assert reader.read_all().num_rows == len(df_sample)
+    with pytest.raises(ValueError):
+        writer.write(df_sample)
+    
+    
+def test_stream_writer_requires_hooks(tmp_path):
+    '''tests that writers missing a hook fail when constructed'''
+    
+    class IncompleteWriter(dp.StreamWriter):
+        def _write(self, chunk):
+            pass
+            
+    with pytest.raises(TypeError):
+        IncompleteWriter(tmp_path/'test.csv')